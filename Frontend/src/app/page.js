@@ -7,7 +7,7 @@ import ResultsPanel from '../components/ResultsPanel';
 import UploadForm from '../components/UploadForm';
 import {
   downloadGeneratedFile,
-  optimizeResumeRequest,
+  optimizeResumeStream,
   validateResumeFile,
   validateSubmission,
 } from '../lib/resumate';
@@ -43,6 +43,7 @@ export default function ResumateApp() {
   const [resumeFile, setResumeFile] = useState(null);
   const [jobDescription, setJobDescription] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [progressLabel, setProgressLabel] = useState('');
   const [error, setError] = useState('');
   const [results, setResults] = useState(null);
   const fileInputRef = useRef(null);
@@ -87,12 +88,17 @@ export default function ResumateApp() {
     setResults(null);
 
     try {
-      const data = await optimizeResumeRequest(resumeFile, jobDescription);
+      const data = await optimizeResumeStream(resumeFile, jobDescription, {
+        onStage: () => setProgressLabel('Reading your resume…'),
+        onKeywords: ({ count }) => setProgressLabel(`Matched ${count} keywords, rewriting resume…`),
+        onCoverLetterToken: () => setProgressLabel('Drafting your cover letter…'),
+      });
       setResults(data);
     } catch (requestError) {
       setError(`Failed to optimize resume: ${requestError.message}`);
     } finally {
       setIsLoading(false);
+      setProgressLabel('');
     }
   };
 
@@ -247,6 +253,7 @@ export default function ResumateApp() {
             error={error}
             fileInputRef={fileInputRef}
             isLoading={isLoading}
+            progressLabel={progressLabel}
             jobDescription={jobDescription}
             onFileUpload={handleFileUpload}
             onJobDescriptionChange={setJobDescription}
@@ -13,6 +13,7 @@ export default function UploadForm({
   onFileUpload,
   onJobDescriptionChange,
   onSubmit,
+  progressLabel,
   resumeFile,
   submissionError,
 }) {
@@ -95,7 +96,7 @@ export default function UploadForm({
           {isLoading ? (
             <>
               <Loader2 className="upload-btn-icon upload-btn-spinner" />
-              <span>Optimizing Your Resume…</span>
+              <span>{progressLabel || 'Optimizing Your Resume…'}</span>
             </>
           ) : (
             <>
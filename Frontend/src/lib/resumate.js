@@ -9,6 +9,7 @@ export {
 export {
   downloadGeneratedFile,
   optimizeResumeRequest,
+  optimizeResumeStream,
 } from './resumate/api';
 export {
   validateResumeFile,
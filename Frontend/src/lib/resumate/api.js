@@ -1,13 +1,9 @@
 import { API_BASE_URL } from './constants';
 
 export async function optimizeResumeRequest(resumeFile, jobDescription) {
-  const formData = new FormData();
-  formData.append('resume_file', resumeFile);
-  formData.append('job_description', jobDescription.trim());
-
   const response = await fetch(`${API_BASE_URL}/optimize-resume`, {
     method: 'POST',
-    body: formData,
+    body: buildOptimizeFormData(resumeFile, jobDescription),
   });
 
   if (!response.ok) {
@@ -17,6 +13,50 @@ export async function optimizeResumeRequest(resumeFile, jobDescription) {
   return response.json();
 }
 
+export async function optimizeResumeStream(resumeFile, jobDescription, handlers = {}) {
+  const response = await fetch(`${API_BASE_URL}/optimize-resume/stream`, {
+    method: 'POST',
+    body: buildOptimizeFormData(resumeFile, jobDescription),
+    headers: { Accept: 'text/event-stream' },
+  });
+
+  if (!response.ok) {
+    throw new Error(await parseApiError(response));
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const event = parseSseFrame(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      if (!event) {
+        continue;
+      }
+      if (event.name === 'error') {
+        throw new Error(event.data.message || 'Streaming failed');
+      }
+      if (event.name === 'files') {
+        reader.cancel();
+        return event.data;
+      }
+      handlers[STREAM_HANDLERS[event.name]]?.(event.data);
+    }
+
+    if (done) {
+      throw new Error('Stream ended before files were ready');
+    }
+  }
+}
+
 export async function downloadGeneratedFile(url, name) {
   const response = await fetch(url);
   if (!response.ok) {
@@ -34,6 +74,39 @@ export async function downloadGeneratedFile(url, name) {
   URL.revokeObjectURL(objectUrl);
 }
 
+const STREAM_HANDLERS = {
+  stage: 'onStage',
+  keywords: 'onKeywords',
+  resume_token: 'onResumeToken',
+  cover_letter_token: 'onCoverLetterToken',
+};
+
+function buildOptimizeFormData(resumeFile, jobDescription) {
+  const formData = new FormData();
+  formData.append('resume_file', resumeFile);
+  formData.append('job_description', jobDescription.trim());
+  return formData;
+}
+
+function parseSseFrame(frame) {
+  let name = 'message';
+  const dataLines = [];
+
+  for (const line of frame.split('\n')) {
+    if (line.startsWith('event:')) {
+      name = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      dataLines.push(line.slice(5).trim());
+    }
+  }
+
+  if (!dataLines.length) {
+    return null;
+  }
+
+  return { name, data: JSON.parse(dataLines.join('\n')) };
+}
+
 async function parseApiError(response) {
   const errorText = await response.text();
 
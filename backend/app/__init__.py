@@ -1,2 +1,8 @@
-from .api import app
+def __getattr__(name: str):
+    # Imported lazily so parse worker processes, which import app.parsing,
+    # do not build the whole API.
+    if name == "app":
+        from .api import app
 
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,42 +1,137 @@
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
 from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from .config import (
     ALLOWED_FILE_TYPES,
     ALLOWED_ORIGINS,
+    ARTIFACT_DISK_MAX_MB,
+    ARTIFACT_MEMORY_MAX_MB,
+    ARTIFACT_STORE,
+    ATS_MAX_TERMS,
+    BATCH_CONCURRENCY,
+    BATCH_MAX_JOBS,
     CLEANUP_INTERVAL_HOURS,
     DEBUG,
     HOST,
+    JANITOR_INTERVAL_SECONDS,
+    JOB_DB_PATH,
+    JOB_LEASE_SECONDS,
+    JOB_WORKERS,
+    KEYWORD_CACHE_MAX_DISK_ENTRIES,
+    KEYWORD_CACHE_MAX_ENTRIES,
+    KEYWORD_CACHE_ON_DISK,
+    KEYWORD_CACHE_TTL_HOURS,
+    LLM_RATE_LIMIT_PER_MINUTE,
     MAX_FILE_SIZE_MB,
+    METRICS_ENABLED,
+    PARSED_RESUME_CACHE_MAX_MB,
+    PARSED_RESUME_CACHE_TTL_HOURS,
     PORT,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_DB_PATH,
     RATE_LIMIT_PER_MINUTE,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_TTL_HOURS,
     TEMP_DIR,
     ensure_temp_dir,
     logger,
 )
-from .optimizer import ResumeOptimizer, initialize_model
+from .artifacts import create_artifact_store
+from .cache import ContentCache, SingleFlight
+from .janitor import Janitor
+from .jobs import JobQueue, JobStore, job_result, job_status_payload, stored_upload
+from .logs import REQUEST_ID_HEADER, SAMPLED, RequestIdMiddleware, error_response
+from .metrics import (
+    MetricsMiddleware,
+    Snapshot,
+    current_stage_timings,
+    registry,
+    time_stage,
+    track_stage_timings,
+)
+from .optimizer import ModelManager, ResumeOptimizer
+from .parsing import DocumentParser
 from .processing import (
     build_file_extractors,
     build_success_response,
+    cached_result,
     extract_resume_text,
+    format_sse,
     log_upload_request,
-    save_output_files,
+    result_cache_key,
+    result_payload,
+    run_batch_optimization,
+    run_optimization,
+    stream_optimization_events,
+    validate_optimizer_mode,
     validate_upload_request,
 )
+from .ratelimit import BucketSpec, RateLimiter, client_key, create_rate_limit_store, estimated_ai_calls
+from .scoring import score_match
+from .uploads import IngestedUpload, RequestSizeLimitMiddleware, ingest_upload
 
 ensure_temp_dir()
-optimizer = ResumeOptimizer(initialize_model())
-file_extractors = build_file_extractors(optimizer)
+keyword_cache = ContentCache(
+    "keyword",
+    max_entries=KEYWORD_CACHE_MAX_ENTRIES,
+    ttl_seconds=KEYWORD_CACHE_TTL_HOURS * 3600,
+    disk_dir=TEMP_DIR / "keyword_cache" if KEYWORD_CACHE_ON_DISK else None,
+    max_disk_entries=KEYWORD_CACHE_MAX_DISK_ENTRIES,
+)
+model_manager = ModelManager()
+optimizer = ResumeOptimizer(model_manager, keyword_cache=keyword_cache)
+parsed_resume_cache = ContentCache(
+    "parsed_resume",
+    max_entries=0,
+    ttl_seconds=PARSED_RESUME_CACHE_TTL_HOURS * 3600,
+    max_bytes=int(PARSED_RESUME_CACHE_MAX_MB * 1024 * 1024),
+)
+document_parser = DocumentParser(text_cache=parsed_resume_cache)
+file_extractors = build_file_extractors(document_parser)
+artifact_store = create_artifact_store(
+    ARTIFACT_STORE,
+    TEMP_DIR,
+    ttl_seconds=CLEANUP_INTERVAL_HOURS * 3600,
+    max_disk_bytes=ARTIFACT_DISK_MAX_MB * 1024 * 1024,
+    max_memory_bytes=ARTIFACT_MEMORY_MAX_MB * 1024 * 1024,
+)
+# Entries point at stored files, so they never outlive the artifacts.
+result_cache = ContentCache(
+    "result",
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=min(RESULT_CACHE_TTL_HOURS, CLEANUP_INTERVAL_HOURS) * 3600,
+)
+result_flight = SingleFlight()
+job_store = JobStore(JOB_DB_PATH)
+job_queue = JobQueue(
+    job_store,
+    optimizer,
+    file_extractors,
+    artifact_store,
+    workers=JOB_WORKERS,
+    lease_seconds=JOB_LEASE_SECONDS,
+)
+janitor = Janitor(
+    artifact_store,
+    job_store,
+    interval_seconds=JANITOR_INTERVAL_SECONDS,
+    job_max_age_seconds=CLEANUP_INTERVAL_HOURS * 3600,
+)
 
-limiter = Limiter(key_func=get_remote_address)
+rate_limiter = RateLimiter(
+    create_rate_limit_store(RATE_LIMIT_BACKEND, RATE_LIMIT_DB_PATH),
+    {
+        "requests": BucketSpec.per_minute(RATE_LIMIT_PER_MINUTE),
+        "llm": BucketSpec.per_minute(LLM_RATE_LIMIT_PER_MINUTE),
+    },
+)
 
 app = FastAPI(
     title="Resumate API",
@@ -45,34 +140,17 @@ app = FastAPI(
     debug=DEBUG,
 )
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RequestSizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
-
-
-def cleanup_old_files() -> None:
-    """Clean up generated files older than the configured interval."""
-    if not TEMP_DIR.exists():
-        return
-
-    current_time = datetime.now()
-    cleanup_threshold = timedelta(hours=CLEANUP_INTERVAL_HOURS)
-    for file_path in TEMP_DIR.iterdir():
-        if file_path.is_file():
-            file_modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-            if current_time - file_modified > cleanup_threshold:
-                try:
-                    file_path.unlink()
-                    logger.info(f"Cleaned up old file: {file_path.name}")
-                except Exception as exc:
-                    logger.error(f"Failed to cleanup file {file_path.name}: {exc}")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.get("/")
@@ -96,10 +174,30 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health information used by the frontend or deployment checks."""
+    # Both query SQLite behind a lock a janitor sweep may be holding.
+    artifacts, rate_limit = await asyncio.gather(
+        asyncio.to_thread(artifact_store.stats),
+        asyncio.to_thread(rate_limiter.stats),
+    )
     return {
         "status": "healthy",
         "ai_configured": optimizer.use_gemini,
+        "ai": model_manager.status(),
         "temp_dir_exists": TEMP_DIR.exists(),
+        "artifacts": artifacts,
+        "janitor": janitor.stats(),
+        "parser": document_parser.stats(),
+        "llm": optimizer.llm.stats(),
+        "rate_limit": rate_limit,
+        "jobs": {
+            "workers": job_queue.workers,
+            "queued": job_queue.queue_depth(),
+        },
+        "caches": {
+            "keywords": keyword_cache.stats(),
+            "parsed_resumes": parsed_resume_cache.stats(),
+            "results": result_cache.stats(),
+        },
         "config": {
             "host": HOST,
             "port": PORT,
@@ -111,114 +209,455 @@ async def health_check():
     }
 
 
+def service_metrics() -> list[Snapshot]:
+    """Read gauges and running totals from the components' own stats."""
+    llm = optimizer.llm.stats()
+    parser = document_parser.stats()
+    caches = {
+        "keywords": keyword_cache.stats(),
+        "parsed_resumes": parsed_resume_cache.stats(),
+        "results": result_cache.stats(),
+    }
+    return [
+        Snapshot("resumate_llm_in_flight", "gauge", "AI calls running on the worker pool.", [({}, llm["in_flight"])]),
+        Snapshot(
+            "resumate_llm_events_total",
+            "counter",
+            "AI calls and their retries, failures, timeouts and hedges.",
+            [({"event": event}, llm[event]) for event in ("calls", "retries", "failures", "timeouts", "hedges")],
+        ),
+        Snapshot(
+            "resumate_llm_breaker_open",
+            "gauge",
+            "1 while the circuit breaker is routing requests to demo mode.",
+            [({}, int(llm["breaker"]["state"] == "open"))],
+        ),
+        Snapshot(
+            "resumate_cache_lookups_total",
+            "counter",
+            "Cache lookups by cache and result.",
+            [
+                ({"cache": name, "result": result}, stats[key])
+                for name, stats in caches.items()
+                for result, key in (("hit", "hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))
+            ],
+        ),
+        Snapshot(
+            "resumate_cache_hit_ratio",
+            "gauge",
+            "Share of lookups served from the cache since startup.",
+            [({"cache": name}, stats["hit_rate"]) for name, stats in caches.items()],
+        ),
+        Snapshot(
+            "resumate_parser_events_total",
+            "counter",
+            "Document parses, parse timeouts and parse pool restarts.",
+            [({"event": event}, parser[event]) for event in ("parses", "timeouts", "pool_restarts")],
+        ),
+        Snapshot(
+            "resumate_rate_limit_rejections_total",
+            "counter",
+            "Requests refused with 429 by the rate limiter.",
+            [({}, rate_limiter.rejections)],
+        ),
+        Snapshot(
+            "resumate_result_requests_total",
+            "counter",
+            "Optimize requests that ran the pipeline or awaited an identical one already in flight.",
+            [({"role": "leader"}, result_flight.leaders), ({"role": "coalesced"}, result_flight.coalesced)],
+        ),
+        Snapshot(
+            "resumate_result_in_flight",
+            "gauge",
+            "Distinct optimize pipelines running for /optimize-resume.",
+            [({}, result_flight.in_flight())],
+        ),
+        Snapshot(
+            "resumate_keyword_fallbacks_total",
+            "counter",
+            "Keyword lists taken from local scoring because the AI was slow or unavailable.",
+            [({}, optimizer.keyword_fallbacks)],
+        ),
+        Snapshot("resumate_job_queue_depth", "gauge", "Queued background jobs.", [({}, job_queue.queue_depth())]),
+    ]
+
+
+@app.get("/metrics")
+async def metrics():
+    """Expose request, stage and component metrics in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(
+        content=registry.render(service_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+async def find_cached_result(
+    request: Request,
+    resume_file: UploadFile,
+    job_description: str,
+    mode: str,
+) -> tuple[IngestedUpload, str, dict | None]:
+    """Charge the base request cost, read the upload and look up a memoized result.
+
+    The upload is keyed by the digest computed while it was read, and is
+    returned open so the pipeline parses it without reading it again; the
+    caller closes it.
+
+    A hit is timed as this request, so its `processing_time` is the lookup's
+    own latency rather than that of the run that produced it.
+    """
+    await rate_limiter.check(client_key(request), {"requests": 1})
+    with time_stage("read"):
+        upload = await ingest_upload(resume_file)
+    try:
+        cache_key = result_cache_key(upload.digest, job_description, mode, model_manager.model_name)
+        result = await asyncio.to_thread(cached_result, result_cache, artifact_store, cache_key)
+    except BaseException:
+        upload.close()
+        raise
+    if result is not None:
+        timings = current_stage_timings()
+        result = {**result, "timings": timings.as_dict() if timings else None}
+    return upload, cache_key, result
+
+
+async def run_or_join_pipeline(
+    request: Request,
+    resume_file: UploadFile,
+    upload: IngestedUpload,
+    job_description: str,
+    mode: str,
+    cache_key: str,
+    emit: Callable[[str, dict], None] | None = None,
+) -> tuple[dict, str]:
+    """Run the pipeline, or share an identical run already in flight.
+
+    Only the request that starts a run is charged for its AI calls, as the
+    run's first step. If that charge is refused, the requests that joined it
+    try again on their own budget rather than inheriting the 429.
+    """
+    client = client_key(request)
+
+    async def charge_and_run() -> dict:
+        await rate_limiter.check(client, {"llm": estimated_ai_calls(mode)})
+        return await run_optimization(
+            optimizer,
+            artifact_store,
+            resume_file,
+            file_extractors,
+            job_description,
+            mode=mode,
+            result_cache=result_cache,
+            cache_key=cache_key,
+            emit=emit,
+            upload=upload,
+        )
+
+    while True:
+        joining = result_flight.running(cache_key)
+        try:
+            result, shared = await result_flight.run(cache_key, charge_and_run)
+        except HTTPException as exc:
+            if joining and exc.status_code == 429:
+                continue
+            raise
+        return result, "coalesced" if shared else "miss"
+
+
 @app.post("/optimize-resume")
 async def optimize_resume(
     request: Request,
     resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
     job_description: str = Form(..., description="Job description text"),
+    mode: str | None = Form(None, description="Pipeline mode: chain or single_pass"),
 ):
-    """Handle the full optimization workflow from upload to generated files."""
+    """Handle the full optimization workflow from upload to generated files.
+
+    A repeat of an earlier request (same resume bytes, job description, mode
+    and model) returns the stored result, and identical requests that arrive
+    together share one pipeline run.
+    """
     try:
+        track_stage_timings()
         log_upload_request(resume_file, job_description)
-        normalized_job_description = validate_upload_request(resume_file, job_description)
-        original_resume_text = await extract_resume_text(resume_file, file_extractors)
+        with time_stage("validate"):
+            normalized_job_description = validate_upload_request(resume_file, job_description)
+            mode = validate_optimizer_mode(mode)
+        upload, cache_key, result = await find_cached_result(request, resume_file, normalized_job_description, mode)
+        try:
+            if result is not None:
+                cache = "hit"
+            else:
+                result, cache = await run_or_join_pipeline(
+                    request, resume_file, upload, normalized_job_description, mode, cache_key
+                )
+        finally:
+            upload.close()
+
+        logger.info("Processing completed successfully (result cache %s)", cache, extra=SAMPLED)
+        return JSONResponse(result_payload(request, resume_file, result, cache))
+    except HTTPException as exc:
+        logger.error(f"Validation error: {exc.detail}")
+        raise
+    except Exception as exc:
+        logger.error(f"Unexpected error: {exc}")
+        raise HTTPException(status_code=500, detail=f"Processing error: {exc}") from exc
 
-        logger.info("Extracting keywords from job description")
-        keywords = optimizer.extract_keywords(normalized_job_description)
 
-        logger.info("Optimizing resume")
-        optimized_resume = optimizer.optimize_resume(
-            original_resume_text,
-            normalized_job_description,
-            keywords,
+@app.post("/optimize-resume/stream")
+async def optimize_resume_stream(
+    request: Request,
+    resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text"),
+    mode: str | None = Form(None, description="Pipeline mode: chain or single_pass"),
+):
+    """Run the same workflow as /optimize-resume but report progress over SSE.
+
+    A memoized result is replayed as a single `files` event.
+    """
+    track_stage_timings()
+    log_upload_request(resume_file, job_description)
+    with time_stage("validate"):
+        normalized_job_description = validate_upload_request(resume_file, job_description)
+        mode = validate_optimizer_mode(mode)
+    upload, cache_key, result = await find_cached_result(request, resume_file, normalized_job_description, mode)
+    if result is not None:
+        logger.info("Streaming processing completed successfully (result cache hit)", extra=SAMPLED)
+        events = iter([format_sse("files", result_payload(request, resume_file, result, "hit"))])
+    else:
+        events = stream_optimization_events(
+            request,
+            resume_file,
+            lambda emit: run_or_join_pipeline(
+                request, resume_file, upload, normalized_job_description, mode, cache_key, emit
+            ),
         )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(upload.close),
+    )
 
-        logger.info("Generating cover letter")
-        cover_letter = optimizer.generate_cover_letter(
-            optimized_resume,
-            normalized_job_description,
+
+@app.post("/optimize-resume/batch")
+async def optimize_resume_batch(
+    request: Request,
+    resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_descriptions: list[str] = Form(..., description="One form field per job description"),
+    mode: str | None = Form(None, description="Pipeline mode: chain or single_pass"),
+):
+    """Tailor one resume to several job descriptions and return a single ZIP."""
+    if len(job_descriptions) > BATCH_MAX_JOBS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many job descriptions. Maximum is {BATCH_MAX_JOBS} per batch.",
         )
 
-        file_paths = save_output_files(optimizer, optimized_resume, cover_letter)
-        logger.info("Processing completed successfully")
-        return build_success_response(
-            request=request,
-            resume_file=resume_file,
-            keywords=keywords,
-            file_paths=file_paths,
-            ai_powered=optimizer.use_gemini,
+    mode = validate_optimizer_mode(mode)
+    log_upload_request(resume_file, "\n\n".join(job_descriptions))
+    logger.info(f"Batch size: {len(job_descriptions)} job descriptions")
+    normalized_job_descriptions = []
+    with time_stage("validate"):
+        for index, job_description in enumerate(job_descriptions, 1):
+            try:
+                normalized_job_descriptions.append(validate_upload_request(resume_file, job_description))
+            except HTTPException as exc:
+                raise HTTPException(status_code=exc.status_code, detail=f"Job {index}: {exc.detail}") from exc
+    await rate_limiter.check(
+        client_key(request),
+        {"requests": 1, "llm": estimated_ai_calls(mode, len(normalized_job_descriptions))},
+    )
+
+    try:
+        zip_bytes, manifest = await run_batch_optimization(
+            optimizer,
+            artifact_store,
+            resume_file,
+            file_extractors,
+            normalized_job_descriptions,
+            concurrency=BATCH_CONCURRENCY,
+            mode=mode,
         )
     except HTTPException as exc:
-        logger.error(f"Validation error: {exc.detail}")
+        logger.error(f"Batch error: {exc.detail}")
         raise
     except Exception as exc:
-        logger.error(f"Unexpected error: {exc}")
+        logger.error(f"Unexpected batch error: {exc}")
         raise HTTPException(status_code=500, detail=f"Processing error: {exc}") from exc
 
+    succeeded = sum(1 for job in manifest["jobs"] if job["status"] == "succeeded")
+    logger.info(f"Batch {manifest['batch_id']} completed: {succeeded}/{len(manifest['jobs'])} succeeded")
+    return Response(
+        content=zip_bytes,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=resumate_batch_{manifest['batch_id']}.zip",
+            "X-Batch-Succeeded": str(succeeded),
+            "X-Batch-Failed": str(len(manifest["jobs"]) - succeeded),
+        },
+    )
+
+
+@app.post("/ats-score")
+async def ats_score(
+    request: Request,
+    resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text"),
+):
+    """Score a resume against a job description locally, without an AI call."""
+    timings = track_stage_timings()
+    log_upload_request(resume_file, job_description)
+    with time_stage("validate"):
+        normalized_job_description = validate_upload_request(resume_file, job_description)
+    await rate_limiter.check(client_key(request), {"requests": 1})
+    try:
+        resume_text = await extract_resume_text(resume_file, file_extractors)
+        with time_stage("ats_score"):
+            match = score_match(normalized_job_description, resume_text, ATS_MAX_TERMS)
+    except HTTPException as exc:
+        logger.error(f"ATS scoring error: {exc.detail}")
+        raise
+    except Exception as exc:
+        logger.error(f"Unexpected ATS scoring error: {exc}")
+        raise HTTPException(status_code=500, detail=f"Processing error: {exc}") from exc
+    return {**match.as_dict(), "timings": timings.as_dict()}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text"),
+    mode: str | None = Form(None, description="Pipeline mode: chain or single_pass"),
+):
+    """Queue an optimization and return immediately with a job ID to poll."""
+    log_upload_request(resume_file, job_description)
+    with time_stage("validate"):
+        normalized_job_description = validate_upload_request(resume_file, job_description)
+        mode = validate_optimizer_mode(mode)
+    await rate_limiter.check(client_key(request), {"requests": 1, "llm": estimated_ai_calls(mode)})
+    with time_stage("read"):
+        upload = await ingest_upload(resume_file)
+    try:
+        resume_bytes = upload.read_bytes()
+    finally:
+        upload.close()
+    job_id = await job_queue.submit(
+        filename=resume_file.filename,
+        content_type=resume_file.content_type,
+        resume_bytes=resume_bytes,
+        job_description=normalized_job_description,
+        mode=mode,
+    )
+    base_url = f"{request.url.scheme}://{request.url.netloc}"
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"{base_url}/jobs/{job_id}",
+        "result_url": f"{base_url}/jobs/{job_id}/result",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Report a job's current stage and progress."""
+    job = await asyncio.to_thread(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status_payload(job)
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str):
+    """Return the same payload as /optimize-resume once the job has finished."""
+    job = await asyncio.to_thread(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=job["status_code"] or 500, detail=job["error"])
+    if job["status"] != "succeeded":
+        return JSONResponse(status_code=202, content=job_status_payload(job))
+
+    result = job_result(job)
+    return build_success_response(
+        request=request,
+        resume_file=stored_upload(job),
+        keywords=result["keywords"],
+        file_names=result["file_names"],
+        ai_powered=result["ai_powered"],
+        token_usage=result.get("token_usage"),
+        mode=result.get("mode"),
+        timings=result.get("timings"),
+        ats=result.get("ats"),
+    )
+
 
 @app.get("/download/{filename}")
-async def download_file(filename: str):
-    """Serve generated documents while blocking path traversal."""
+async def download_file(filename: str, request: Request):
+    """Serve generated documents with conditional and range support."""
     if Path(filename).name != filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    file_path = TEMP_DIR / filename
-    if not file_path.exists():
-        logger.error(f"File not found: {file_path}")
-        temp_files = list(TEMP_DIR.glob("*"))
-        logger.info(f"Available files: {[file.name for file in temp_files]}")
-        raise HTTPException(status_code=404, detail="File not found")
-
-    logger.info(f"Serving file: {filename} ({file_path.stat().st_size} bytes)")
     try:
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+        # The disk store's index is SQLite and a bundle may be zipped; keep both off the loop.
+        response = await asyncio.to_thread(artifact_store.download_response, filename, request.headers)
     except Exception as exc:
         logger.error(f"Error serving file: {exc}")
         raise HTTPException(status_code=500, detail="Could not serve file") from exc
 
+    if response is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Log startup details and prune stale generated files."""
+    """Log startup details and start the background workers."""
     logger.info("Resumate API Server Starting")
     logger.info(f"Temp directory: {TEMP_DIR.absolute()}")
     logger.info(f"AI Provider: {'Gemini AI' if optimizer.use_gemini else 'Demo Mode'}")
-    logger.info(f"Rate limit: {RATE_LIMIT_PER_MINUTE} requests/minute")
+    logger.info(
+        f"Rate limit: {RATE_LIMIT_PER_MINUTE} requests/minute, {LLM_RATE_LIMIT_PER_MINUTE} AI calls/minute "
+        f"({rate_limiter.store.backend} store)"
+    )
+    logger.info(
+        f"AI concurrency: {optimizer.llm.max_concurrency} calls, timeout {optimizer.llm.timeout_seconds}s"
+    )
     logger.info(f"Max file size: {MAX_FILE_SIZE_MB}MB")
     logger.info(f"Allowed types: {', '.join(ALLOWED_FILE_TYPES)}")
     logger.info(f"CORS origins: {', '.join(ALLOWED_ORIGINS)}")
 
-    if not optimizer.use_gemini:
+    if model_manager.state == "disabled":
         logger.warning("No AI API key configured. Using demo mode.")
         logger.warning("Add GEMINI_API_KEY to your .env file for full functionality.")
 
-    cleanup_old_files()
+    # Start the parse worker pool before the other background threads exist.
+    await asyncio.to_thread(document_parser.check_available)
+    logger.info(f"Document parsing: {document_parser.workers or 'no'} worker processes")
+    model_manager.start()
+    janitor.start()
+    await job_queue.start()
     logger.info("Server ready")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Prune old generated files on shutdown as well."""
-    logger.info("Running final cleanup")
-    cleanup_old_files()
-    logger.info("Cleanup completed - Server shutdown")
+    """Stop background workers; queued jobs resume on the next start."""
+    logger.info("Stopping background workers")
+    await janitor.stop()
+    await job_queue.stop()
+    model_manager.stop()
+    optimizer.shutdown()
+    document_parser.shutdown()
+    logger.info("Server shutdown complete")
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Return a consistent JSON error shape for client-side handling."""
     logger.warning(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "error": True,
-            "message": exc.detail,
-            "status_code": exc.status_code,
-            "timestamp": datetime.now().isoformat(),
-        },
-    )
+    return error_response(exc.status_code, exc.detail, headers=getattr(exc, "headers", None))
 
@@ -0,0 +1,675 @@
+import hashlib
+import heapq
+import io
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, NamedTuple
+
+from fastapi.responses import Response, StreamingResponse
+
+from .config import logger
+from .logs import SAMPLED
+from .metrics import time_stage
+
+ARTIFACT_MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".zip": "application/zip",
+}
+FIXED_ZIP_TIME = (1980, 1, 1, 0, 0, 0)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class ResolvedArtifact(NamedTuple):
+    """Index metadata for a download plus a reader for an inclusive byte span."""
+
+    digest: str
+    size: int
+    read_range: Callable[[int, int], bytes | Iterable[bytes]]
+
+
+def artifact_media_type(name: str) -> str:
+    return ARTIFACT_MEDIA_TYPES.get(Path(name).suffix, "application/octet-stream")
+
+
+def build_zip(members: dict[str, bytes], date_time: tuple | None = None) -> bytes:
+    """Deflate in-memory documents into a ZIP without touching disk.
+
+    Passing `date_time` makes the output byte-for-byte reproducible.
+    """
+    date_time = date_time or time.localtime()[:6]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for arcname, data in members.items():
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zip_file.writestr(info, data)
+    return buffer.getvalue()
+
+
+def new_artifact_id() -> str:
+    """Unique per saved result; shared by its resume, cover letter and bundle."""
+    return uuid.uuid4().hex[:16]
+
+
+def artifact_name(stem: str, artifact_id: str, digest: str, suffix: str) -> str:
+    return f"{stem}_{artifact_id}_{digest[:12]}{suffix}"
+
+
+def attachment_headers(name: str, digest: str | None = None) -> dict[str, str]:
+    headers = {"Content-Disposition": f"attachment; filename={name}"}
+    if digest:
+        # Names embed the content hash, so the bytes behind a name never change.
+        headers["ETag"] = f'"{digest}"'
+        headers["Cache-Control"] = "private, max-age=86400, immutable"
+    return headers
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def parse_byte_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single `bytes=` range into inclusive offsets.
+
+    Returns None when the whole body should be sent (no header, another unit,
+    a malformed value or a multi-range request) and raises ValueError when the
+    range lies outside the artifact.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    if (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if not first:
+        suffix_length = int(last)
+        if suffix_length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - suffix_length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("range starts past the end of the artifact")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class ArtifactStore:
+    """Keeps generated documents addressable by name for /download.
+
+    Callers hand over `stem -> (suffix, bytes)` and get back public names made
+    of a fresh artifact ID plus the content hash, so concurrent saves never
+    collide and identical bytes are stored once.
+    """
+
+    backend = "base"
+
+    def __init__(self, ttl_seconds: float, max_total_bytes: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self.max_total_bytes = max_total_bytes
+        self.expired_total = 0
+        self.quota_evictions_total = 0
+        self.bytes_freed_total = 0
+
+    def put_documents(
+        self,
+        documents: dict[str, tuple[str, bytes]],
+        bundle_stem: str | None = None,
+    ) -> dict[str, str]:
+        """Store documents and, optionally, a ZIP bundle of all of them.
+
+        Returns the public name for each stem, with the bundle under "zip".
+        """
+        raise NotImplementedError
+
+    def read(self, name: str) -> bytes | None:
+        raise NotImplementedError
+
+    def download_response(
+        self,
+        name: str,
+        request_headers: Mapping[str, str] | None = None,
+    ) -> Response | None:
+        """Build the download response, or None when the artifact is gone.
+
+        Honours If-None-Match, If-Range and single byte ranges. Size and ETag
+        come from the index, so neither a 304 nor a miss touches the blob.
+        """
+        artifact = self._resolve(name)
+        if artifact is None:
+            logger.warning(f"Artifact not found: {name}")
+            return None
+
+        request_headers = request_headers or {}
+        headers = attachment_headers(name, artifact.digest)
+        headers["Accept-Ranges"] = "bytes"
+        if etag_matches(request_headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if if_range and if_range.strip() != headers["ETag"]:
+            range_header = None
+        try:
+            byte_range = parse_byte_range(range_header, artifact.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{artifact.size}"
+            return Response(status_code=416, headers=headers)
+
+        status_code = 200
+        start, end = 0, artifact.size - 1
+        if byte_range is not None:
+            status_code = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        try:
+            body = artifact.read_range(start, end) if artifact.size else b""
+        except FileNotFoundError:
+            logger.error(f"Blob missing for {name}")
+            return None
+
+        logger.info("Serving file: %s (bytes %d-%d/%d)", name, start, end, artifact.size, extra=SAMPLED)
+        media_type = artifact_media_type(name)
+        if isinstance(body, bytes):
+            return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+        return StreamingResponse(body, status_code=status_code, media_type=media_type, headers=headers)
+
+    def exists(self, name: str) -> bool:
+        """Whether `name` can still be downloaded; reads the index, not the blob."""
+        return self._resolve(name) is not None
+
+    def _resolve(self, name: str) -> ResolvedArtifact | None:
+        raise NotImplementedError
+
+    def sweep(self) -> dict:
+        """Evict expired artifacts, then the oldest ones while over quota.
+
+        Driven by an expiry index, so a sweep only touches entries it removes.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **self.eviction_stats()}
+
+    def eviction_stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "max_total_bytes": self.max_total_bytes,
+            "expired_total": self.expired_total,
+            "quota_evictions_total": self.quota_evictions_total,
+            "bytes_freed_total": self.bytes_freed_total,
+        }
+
+    def _record_sweep(self, expired: int, over_quota: int, bytes_freed: int) -> dict:
+        self.expired_total += expired
+        self.quota_evictions_total += over_quota
+        self.bytes_freed_total += bytes_freed
+        if expired or over_quota:
+            logger.info(
+                f"Evicted {expired} expired and {over_quota} over-quota {self.backend} artifacts "
+                f"({bytes_freed} bytes freed)"
+            )
+        return {"expired": expired, "over_quota": over_quota, "bytes_freed": bytes_freed}
+
+
+class DiskArtifactStore(ArtifactStore):
+    """Deduplicated blobs under a directory plus a SQLite name index.
+
+    Every worker that mounts the directory shares the index, so names and
+    reference counts stay consistent across processes.
+    """
+
+    backend = "disk"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS artifacts (
+        name TEXT PRIMARY KEY,
+        digest TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        suffix TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL
+    );
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float, max_total_bytes: int = 0):
+        super().__init__(ttl_seconds, max_total_bytes)
+        self.directory = directory
+        self.blob_dir = directory / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.dedup_hits = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(directory / "artifacts.sqlite3"),
+            check_same_thread=False,
+            timeout=30,
+        )
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self.SCHEMA)
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(artifacts)")}
+            if "expires_at" not in columns:
+                self._connection.execute("ALTER TABLE artifacts ADD COLUMN expires_at REAL NOT NULL DEFAULT 0")
+                self._connection.execute(
+                    "UPDATE artifacts SET expires_at = created_at + ?",
+                    (self.ttl_seconds,),
+                )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS artifacts_expires ON artifacts (expires_at)"
+            )
+
+    def put_documents(
+        self,
+        documents: dict[str, tuple[str, bytes]],
+        bundle_stem: str | None = None,
+    ) -> dict[str, str]:
+        artifact_id = new_artifact_id()
+        entries = {}
+        names = {}
+        for stem, (suffix, data) in documents.items():
+            digest = hashlib.sha256(data).hexdigest()
+            entries[stem] = (suffix, data, digest)
+            names[stem] = artifact_name(stem, artifact_id, digest, suffix)
+
+        if bundle_stem:
+            with time_stage("zip"):
+                bundle = build_zip({names[stem]: data for stem, (_, data) in documents.items()})
+            bundle_digest = hashlib.sha256(bundle).hexdigest()
+            entries["zip"] = (".zip", bundle, bundle_digest)
+            names["zip"] = artifact_name(bundle_stem, artifact_id, bundle_digest, ".zip")
+
+        for suffix, data, digest in entries.values():
+            self._write_blob(digest, suffix, data)
+
+        now = time.time()
+        with self._lock, self._connection:
+            for key, (suffix, data, digest) in entries.items():
+                self._connection.execute(
+                    """
+                    INSERT INTO blobs (digest, suffix, size, refcount) VALUES (?, ?, ?, 1)
+                    ON CONFLICT(digest) DO UPDATE SET refcount = refcount + 1
+                    """,
+                    (digest, suffix, len(data)),
+                )
+                # The blob was written before the lock; a sweep may have removed it
+                # since. Holding the reference now, rewrite it if so.
+                self._write_blob(digest, suffix, data)
+                refcount = self._connection.execute(
+                    "SELECT refcount FROM blobs WHERE digest = ?",
+                    (digest,),
+                ).fetchone()[0]
+                if refcount > 1:
+                    self.dedup_hits += 1
+                self._connection.execute(
+                    "INSERT INTO artifacts (name, digest, size, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (names[key], digest, len(data), now, now + self.ttl_seconds),
+                )
+        return names
+
+    def read(self, name: str) -> bytes | None:
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        digest, suffix, _ = entry
+        try:
+            return self._blob_path(digest, suffix).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _resolve(self, name: str) -> ResolvedArtifact | None:
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        digest, suffix, size = entry
+        blob_path = self._blob_path(digest, suffix)
+
+        def read_range(start: int, end: int) -> Iterable[bytes]:
+            # Open eagerly so a blob removed by a concurrent sweep is a 404,
+            # not a response that dies after its headers were sent.
+            file_handle = open(blob_path, "rb")
+            file_handle.seek(start)
+
+            def chunks():
+                with file_handle:
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = file_handle.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        yield chunk
+
+            return chunks()
+
+        return ResolvedArtifact(digest, size, read_range)
+
+    def sweep(self) -> dict:
+        now = time.time()
+        with self._lock, self._connection:
+            expired = self._connection.execute(
+                "SELECT name, digest FROM artifacts WHERE expires_at <= ?",
+                (now,),
+            ).fetchall()
+            for name, digest in expired:
+                self._release(name, digest)
+
+            over_quota = 0
+            if self.max_total_bytes:
+                total = self._connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM blobs WHERE refcount > 0"
+                ).fetchone()[0]
+                while total > self.max_total_bytes:
+                    oldest = self._connection.execute(
+                        "SELECT name, digest FROM artifacts ORDER BY expires_at LIMIT 1"
+                    ).fetchone()
+                    if oldest is None:
+                        break
+                    total -= self._release(*oldest)
+                    over_quota += 1
+
+            orphans = self._connection.execute(
+                "SELECT digest, suffix, size FROM blobs WHERE refcount <= 0"
+            ).fetchall()
+            self._connection.execute("DELETE FROM blobs WHERE refcount <= 0")
+
+            # Unlink inside the transaction: its write lock keeps any put_documents,
+            # in this process or another, from re-referencing a blob mid-delete.
+            for digest, suffix, _ in orphans:
+                try:
+                    self._blob_path(digest, suffix).unlink(missing_ok=True)
+                except Exception as exc:
+                    logger.error(f"Failed to cleanup blob {digest}: {exc}")
+
+        return self._record_sweep(len(expired), over_quota, sum(size for _, _, size in orphans))
+
+    def stats(self) -> dict:
+        with self._lock:
+            artifacts, blobs, blob_bytes = self._connection.execute(
+                "SELECT (SELECT COUNT(*) FROM artifacts), COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "backend": self.backend,
+            "artifacts": artifacts,
+            "blobs": blobs,
+            "bytes": blob_bytes,
+            "dedup_hits": self.dedup_hits,
+            **self.eviction_stats(),
+        }
+
+    def _lookup(self, name: str) -> tuple[str, str, int] | None:
+        with self._lock:
+            return self._connection.execute(
+                """
+                SELECT artifacts.digest, blobs.suffix, artifacts.size
+                FROM artifacts JOIN blobs ON blobs.digest = artifacts.digest
+                WHERE artifacts.name = ?
+                """,
+                (name,),
+            ).fetchone()
+
+    def _release(self, name: str, digest: str) -> int:
+        """Drop one name; return the bytes freed if its blob is now unreferenced."""
+        self._connection.execute("DELETE FROM artifacts WHERE name = ?", (name,))
+        self._connection.execute(
+            "UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?",
+            (digest,),
+        )
+        row = self._connection.execute(
+            "SELECT size FROM blobs WHERE digest = ? AND refcount <= 0",
+            (digest,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _blob_path(self, digest: str, suffix: str) -> Path:
+        return self.blob_dir / f"{digest}{suffix}"
+
+    def _write_blob(self, digest: str, suffix: str, data: bytes) -> None:
+        blob_path = self._blob_path(digest, suffix)
+        if blob_path.exists():
+            return
+        temp_path = blob_path.with_name(f"{blob_path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as file_handle:
+            file_handle.write(data)
+        os.replace(temp_path, blob_path)
+
+    def cleanup_legacy_files(self) -> None:
+        """Remove timestamp-named files written before the blob layout.
+
+        This walks the directory, so the janitor runs it once, off the loop.
+        """
+        current_time = datetime.now()
+        max_age = timedelta(seconds=self.ttl_seconds)
+        for file_path in self.directory.iterdir():
+            if file_path.is_file() and file_path.suffix in ARTIFACT_MEDIA_TYPES:
+                file_modified = datetime.fromtimestamp(file_path.stat().st_mtime)
+                if current_time - file_modified > max_age:
+                    try:
+                        file_path.unlink()
+                        logger.info(f"Cleaned up old file: {file_path.name}")
+                    except Exception as exc:
+                        logger.error(f"Failed to cleanup file {file_path.name}: {exc}")
+
+
+class MemoryArtifactStore(ArtifactStore):
+    """Size-bounded LRU of deduplicated blobs for single-process deployments.
+
+    Bundles are stored as a list of member names and zipped on first download
+    with their creation time as the member timestamp, so the ZIP only takes
+    memory once someone asks for it. The built bytes are then kept under the
+    bundle's digest until it expires or is evicted, so repeat and range
+    downloads slice them instead of rebuilding. The ZIP's size and digest are
+    indexed when it is stored, so existence checks, 304s and range validation
+    never build it. A name whose blob has been evicted is treated as gone.
+    """
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        super().__init__(ttl_seconds, max_bytes)
+        self.total_bytes = 0
+        self.dedup_hits = 0
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._refcounts: dict[str, int] = {}
+        self._names: dict[str, tuple[float, str]] = {}
+        self._bundles: dict[str, tuple[float, list[str], str, int]] = {}
+        self._bundle_bytes: dict[str, bytes] = {}
+        self._expiry: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def put_documents(
+        self,
+        documents: dict[str, tuple[str, bytes]],
+        bundle_stem: str | None = None,
+    ) -> dict[str, str]:
+        artifact_id = new_artifact_id()
+        now = time.time()
+        digests = {stem: hashlib.sha256(data).hexdigest() for stem, (_, data) in documents.items()}
+        names = {
+            stem: artifact_name(stem, artifact_id, digests[stem], suffix)
+            for stem, (suffix, _) in documents.items()
+        }
+        if bundle_stem:
+            # Built once here for its size and digest, then dropped; the first
+            # download rebuilds the same bytes from the members.
+            with time_stage("zip"):
+                bundle = build_zip(
+                    {names[stem]: data for stem, (_, data) in documents.items()},
+                    date_time=time.localtime(now)[:6],
+                )
+            bundle_digest = hashlib.sha256(bundle).hexdigest()
+            names["zip"] = artifact_name(bundle_stem, artifact_id, bundle_digest, ".zip")
+
+        with self._lock:
+            for stem, (suffix, data) in documents.items():
+                digest = digests[stem]
+                if digest in self._blobs:
+                    self.dedup_hits += 1
+                    self._blobs.move_to_end(digest)
+                else:
+                    self._blobs[digest] = data
+                    self.total_bytes += len(data)
+                self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+                self._names[names[stem]] = (now, digest)
+                heapq.heappush(self._expiry, (now + self.ttl_seconds, names[stem]))
+
+            if bundle_stem:
+                members = [names[stem] for stem in documents]
+                self._bundles[names["zip"]] = (now, members, bundle_digest, len(bundle))
+                heapq.heappush(self._expiry, (now + self.ttl_seconds, names["zip"]))
+
+            self._evict()
+        return names
+
+    def read(self, name: str) -> bytes | None:
+        artifact = self._resolve(name)
+        if artifact is None:
+            return None
+        try:
+            return artifact.read_range(0, artifact.size - 1)
+        except FileNotFoundError:
+            return None
+
+    def _resolve(self, name: str) -> ResolvedArtifact | None:
+        with self._lock:
+            entry = self._names.get(name)
+            if entry is not None:
+                data = self._blobs.get(entry[1])
+                if data is None:
+                    return None
+                self._blobs.move_to_end(entry[1])
+                return ResolvedArtifact(entry[1], len(data), lambda start, end: data[start:end + 1])
+
+            bundle = self._bundles.get(name)
+            if bundle is None or self._member_blobs_locked(bundle[1]) is None:
+                return None
+        created_at, members, digest, size = bundle
+
+        def read_range(start: int, end: int) -> bytes:
+            with self._lock:
+                data = self._bundle_bytes.get(digest)
+                contents = self._member_blobs_locked(members) if data is None else None
+            if data is None:
+                if contents is None:
+                    raise FileNotFoundError(name)
+                with time_stage("zip"):
+                    data = build_zip(contents, date_time=time.localtime(created_at)[:6])
+                with self._lock:
+                    if name in self._bundles and digest not in self._bundle_bytes:
+                        self._bundle_bytes[digest] = data
+                        self.total_bytes += len(data)
+                        self._evict()
+            return data[start:end + 1]
+
+        return ResolvedArtifact(digest, size, read_range)
+
+    def sweep(self) -> dict:
+        now = time.time()
+        expired = 0
+        bytes_before = self.total_bytes
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, name = heapq.heappop(self._expiry)
+                if name in self._names:
+                    self._release_name(name)
+                    expired += 1
+                elif name in self._bundles:
+                    self._release_bundle(name)
+                    expired += 1
+            bytes_freed = bytes_before - self.total_bytes
+
+        # The byte quota is enforced on every put, so there is never overflow here.
+        return self._record_sweep(expired, 0, bytes_freed)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "artifacts": len(self._names) + len(self._bundles),
+            "blobs": len(self._blobs),
+            "bytes": self.total_bytes,
+            "dedup_hits": self.dedup_hits,
+            **self.eviction_stats(),
+        }
+
+    def _member_blobs_locked(self, members: list[str]) -> dict[str, bytes] | None:
+        """Each bundle member's bytes, or None once any of them is gone."""
+        contents = {}
+        for member in members:
+            entry = self._names.get(member)
+            data = self._blobs.get(entry[1]) if entry is not None else None
+            if data is None:
+                return None
+            contents[member] = data
+        return contents
+
+    def _release_name(self, name: str) -> None:
+        _, digest = self._names.pop(name)
+        self._refcounts[digest] -= 1
+        if self._refcounts[digest] <= 0:
+            del self._refcounts[digest]
+            data = self._blobs.pop(digest, None)
+            if data is not None:
+                self.total_bytes -= len(data)
+
+    def _release_bundle(self, name: str) -> int:
+        """Forget a bundle and its built bytes; returns the bytes freed."""
+        _, _, digest, _ = self._bundles.pop(name)
+        data = self._bundle_bytes.pop(digest, b"")
+        self.total_bytes -= len(data)
+        return len(data)
+
+    def _evict(self) -> None:
+        evicted = set()
+        while self.total_bytes > self.max_total_bytes and len(self._blobs) > 1:
+            digest, data = self._blobs.popitem(last=False)
+            self.total_bytes -= len(data)
+            self.quota_evictions_total += 1
+            self.bytes_freed_total += len(data)
+            evicted.add(digest)
+
+        if evicted:
+            for name in [name for name, (_, digest) in self._names.items() if digest in evicted]:
+                del self._names[name]
+            for digest in evicted:
+                self._refcounts.pop(digest, None)
+            for name in [
+                name for name, (_, members, _, _) in self._bundles.items()
+                if not all(member in self._names for member in members)
+            ]:
+                self.bytes_freed_total += self._release_bundle(name)
+            logger.info(f"Evicted {len(evicted)} in-memory artifacts")
+
+
+def create_artifact_store(
+    backend: str,
+    directory: Path,
+    ttl_seconds: float,
+    max_disk_bytes: int,
+    max_memory_bytes: int,
+) -> ArtifactStore:
+    if backend == "memory":
+        return MemoryArtifactStore(ttl_seconds, max_memory_bytes)
+    if backend != "disk":
+        logger.warning(f"Unknown ARTIFACT_STORE '{backend}', falling back to disk")
+    return DiskArtifactStore(directory, ttl_seconds, max_disk_bytes)
@@ -0,0 +1,176 @@
+import math
+import re
+from contextvars import ContextVar
+
+from .config import (
+    COVER_LETTER_RESUME_MAX_TOKENS,
+    JOB_DESCRIPTION_MAX_TOKENS,
+    RESUME_SECTION_MAX_TOKENS,
+)
+
+# Gemini averages roughly four characters per token for English prose. The SDK
+# in use exposes no usage metadata, and counting through the API costs a round
+# trip, so budgets and reported usage are estimates from this ratio.
+CHARS_PER_TOKEN = 4
+
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"equal (employment )?opportunity",
+        r"without regard to (race|color|religion|sex|age)",
+        r"reasonable accommodations?",
+        r"e-?verify",
+        r"privacy (policy|notice)",
+        r"applicants? (with|who have) disabilities",
+        r"drug[- ]free workplace",
+    )
+]
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+RESUME_HEADING = re.compile(r"^(?:[A-Z][A-Z &/]{2,40}|[A-Z][A-Za-z &/]{2,40}:)$")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def dedupe_lines(text: str) -> str:
+    """Drop repeated lines, comparing case- and whitespace-insensitively."""
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = re.sub(r"\s+", " ", line).strip().lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Keep whole paragraphs from the top of `text` until the budget runs out."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        if used + len(paragraph) > max_chars:
+            if not kept:
+                kept.append(paragraph[:max_chars].rsplit(" ", 1)[0])
+            break
+        kept.append(paragraph)
+        used += len(paragraph) + 2
+    return "\n\n".join(kept)
+
+
+def strip_boilerplate(line: str) -> str:
+    """Drop the boilerplate sentences of a line and keep everything else."""
+    sentences = SENTENCE_BREAK.split(line.strip())
+    return " ".join(
+        sentence
+        for sentence in sentences
+        if not any(pattern.search(sentence) for pattern in BOILERPLATE_PATTERNS)
+    )
+
+
+def condense_job_description(job_description: str, max_tokens: int = JOB_DESCRIPTION_MAX_TOKENS) -> str:
+    """Strip legal boilerplate sentences and repeated lines, then trim to the budget.
+
+    If nothing but boilerplate would remain, the deduplicated text is used as is.
+    """
+    deduped = dedupe_lines(job_description)
+    lines = []
+    for line in deduped.splitlines():
+        kept = strip_boilerplate(line)
+        # Blank lines separate paragraphs for fit_to_budget; keep them.
+        if kept or not line.strip():
+            lines.append(kept)
+    condensed = "\n".join(lines).strip() or deduped.strip()
+    return fit_to_budget(condensed, max_tokens)
+
+
+def condense_resume_for_cover_letter(
+    optimized_resume: str,
+    max_tokens: int = COVER_LETTER_RESUME_MAX_TOKENS,
+) -> str:
+    return fit_to_budget(optimized_resume, max_tokens)
+
+
+def split_resume_sections(resume: str, max_tokens: int = RESUME_SECTION_MAX_TOKENS) -> list[str]:
+    """Split a resume at headings into chunks that each fit the token budget.
+
+    Sections are packed greedily in order; a single section that is still too
+    large is split between lines.
+    """
+    if estimate_tokens(resume) <= max_tokens:
+        return [resume]
+
+    sections: list[list[str]] = [[]]
+    for line in resume.splitlines():
+        if RESUME_HEADING.match(line.strip()) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: list[str] = []
+    current: list[str] = []
+    current_chars = 0
+    for section in sections:
+        text = "\n".join(section)
+        for piece in section if len(text) > max_chars else [text]:
+            if current and current_chars + len(piece) > max_chars:
+                chunks.append("\n".join(current))
+                current, current_chars = [], 0
+            current.append(piece)
+            current_chars += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class TokenUsage:
+    """Estimated prompt and output tokens spent on one request's AI calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        # Outputs produced locally in place of an AI answer (keyword fallbacks).
+        self.fallbacks = 0
+
+    def record(self, prompt: str, output: str) -> None:
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+        self.output_tokens += estimate_tokens(output)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.prompt_tokens + self.output_tokens,
+            "estimated": True,
+        }
+
+
+_current_usage: ContextVar[TokenUsage | None] = ContextVar("token_usage", default=None)
+
+
+def track_token_usage() -> TokenUsage:
+    """Start a usage tally that AI calls in this task and its children add to."""
+    usage = TokenUsage()
+    _current_usage.set(usage)
+    return usage
+
+
+def record_token_usage(prompt: str, output: str) -> None:
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record(prompt, output)
+
+
+def record_fallback() -> None:
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.fallbacks += 1
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from .config import logger
+
+
+def content_hash(*parts: str | bytes) -> str:
+    """Hash one or more values into a stable cache key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def job_description_key(job_description: str) -> str:
+    """Key a normalized job description so cosmetic whitespace edits still hit."""
+    return content_hash(re.sub(r"\s+", " ", job_description).strip())
+
+
+def value_size(value) -> int:
+    """Approximate the memory a cached value holds, in bytes."""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value))
+
+
+class ContentCache:
+    """LRU cache with TTL expiry and an optional JSON-on-disk second tier.
+
+    The memory tier is bounded by entry count, by total value size, or both
+    (0 disables a bound). The disk tier keeps one file per key and is bounded by
+    its own entry count, tracked in an index built once at startup so writes
+    never rescan the directory.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        disk_dir: Path | None = None,
+        max_disk_entries: int = 0,
+        max_bytes: int = 0,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, object, int]] = OrderedDict()
+        self._disk_index: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.disk_dir is not None:
+            self._load_disk_index()
+
+    def get(self, key: str, is_valid: Callable[[object], bool] | None = None):
+        """Return the cached value or None, promoting disk hits into memory.
+
+        A value that `is_valid` rejects (say, one pointing at files that have
+        since been deleted) is dropped and the lookup counts as a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value, size = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    self.total_bytes -= size
+                    entry = None
+
+        if entry is not None:
+            if is_valid is None or is_valid(value):
+                with self._lock:
+                    self.hits += 1
+                return value
+            self.discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value = self._read_disk(key, now)
+        if value is not None and is_valid is not None and not is_valid(value):
+            self._remove_disk(key)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, value, now)
+        return value
+
+    def set(self, key: str, value) -> None:
+        """Store a JSON-serializable value in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, value, now)
+        self._write_disk(key, value, now)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry from both tiers, e.g. once what it points to is gone."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[2]
+                self.evictions += 1
+        self._remove_disk(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "disk_entries": len(self._disk_index),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _store_memory(self, key: str, value, now: float) -> None:
+        size = value_size(value) if self.max_bytes else 0
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous[2]
+        if self.max_bytes and size > self.max_bytes:
+            return
+        self._entries[key] = (now, value, size)
+        self.total_bytes += size
+        while len(self._entries) > 1 and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _load_disk_index(self) -> None:
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            stored = sorted(
+                (path.stat().st_mtime, path.stem) for path in self.disk_dir.glob("*.json")
+            )
+        except Exception as exc:
+            logger.error(f"Disabling disk tier for {self.name} cache: {exc}")
+            self.disk_dir = None
+            return
+
+        for stored_at, key in stored:
+            self._disk_index[key] = stored_at
+        self._evict_disk(time.time())
+
+    def _read_disk(self, key: str, now: float):
+        if self.disk_dir is None:
+            return None
+        with self._lock:
+            stored_at = self._disk_index.get(key)
+        if stored_at is None:
+            return None
+        if now - stored_at > self.ttl_seconds:
+            self._remove_disk(key)
+            return None
+
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as file_handle:
+                return json.load(file_handle)["value"]
+        except Exception as exc:
+            logger.warning(f"Dropping unreadable {self.name} cache entry {key}: {exc}")
+            self._remove_disk(key)
+            return None
+
+    def _write_disk(self, key: str, value, now: float) -> None:
+        if self.disk_dir is None or self.max_disk_entries <= 0:
+            return
+        try:
+            temp_path = self._disk_path(key).with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as file_handle:
+                json.dump({"stored_at": now, "value": value}, file_handle)
+            temp_path.replace(self._disk_path(key))
+        except Exception as exc:
+            logger.warning(f"Could not persist {self.name} cache entry: {exc}")
+            return
+
+        with self._lock:
+            self._disk_index[key] = now
+            self._disk_index.move_to_end(key)
+        self._evict_disk(now)
+
+    def _evict_disk(self, now: float) -> None:
+        # The index is ordered oldest-write first, so expired and overflow
+        # entries are always at the front.
+        stale = []
+        with self._lock:
+            for key, stored_at in self._disk_index.items():
+                live = len(self._disk_index) - len(stale)
+                if now - stored_at <= self.ttl_seconds and live <= self.max_disk_entries:
+                    break
+                stale.append(key)
+
+        for key in stale:
+            self._remove_disk(key)
+
+    def _remove_disk(self, key: str) -> None:
+        with self._lock:
+            if self._disk_index.pop(key, None) is None:
+                return
+            self.evictions += 1
+        try:
+            self._disk_path(key).unlink(missing_ok=True)
+        except Exception as exc:
+            logger.warning(f"Failed to remove {self.name} cache file {key}: {exc}")
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its outcome.
+
+    The call runs as its own task, so a caller that disconnects does not
+    cancel the work the others are still waiting on.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable]) -> tuple[object, bool]:
+        """Return the call's result and whether it was shared with an earlier caller."""
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.create_task(call(), name=f"single-flight:{key[:12]}")
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def running(self, key: str) -> bool:
+        return key in self._tasks
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Retrieve it so a failure whose callers all left is not logged as unhandled.
+            task.exception()
@@ -4,6 +4,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from .logs import start_queue_logging
+
 load_dotenv()
 IS_VERCEL = bool(os.getenv("VERCEL")) or bool(os.getenv("VERCEL_ENV"))
 
@@ -23,6 +25,7 @@ ALLOWED_ORIGINS = [
 
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", 10))
 MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
+UPLOAD_SPOOL_MB = float(os.getenv("UPLOAD_SPOOL_MB", 1))
 ALLOWED_FILE_TYPES_STR = os.getenv("ALLOWED_FILE_TYPES", "pdf,docx")
 ALLOWED_FILE_TYPES = [
     file_type.strip()
@@ -41,17 +44,75 @@ ALLOWED_CONTENT_TYPES = [
 ]
 MIN_JOB_DESCRIPTION_LENGTH = 50
 MIN_RESUME_TEXT_LENGTH = 100
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", 50))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 0 if IS_VERCEL else min(4, os.cpu_count() or 1)))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", 20))
+PARSED_RESUME_CACHE_MAX_MB = float(os.getenv("PARSED_RESUME_CACHE_MAX_MB", 32))
+PARSED_RESUME_CACHE_TTL_HOURS = float(os.getenv("PARSED_RESUME_CACHE_TTL_HOURS", 24))
 
 DEFAULT_TEMP_DIR = "/tmp/resumate" if IS_VERCEL else "temp_files"
 TEMP_DIR = Path(os.getenv("TEMP_DIR", DEFAULT_TEMP_DIR))
 CLEANUP_INTERVAL_HOURS = int(os.getenv("CLEANUP_INTERVAL_HOURS", 24))
+JANITOR_INTERVAL_SECONDS = float(os.getenv("JANITOR_INTERVAL_SECONDS", 300))
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "disk").lower()
+ARTIFACT_MEMORY_MAX_MB = int(os.getenv("ARTIFACT_MEMORY_MAX_MB", 256))
+ARTIFACT_DISK_MAX_MB = int(os.getenv("ARTIFACT_DISK_MAX_MB", 0))
+
+KEYWORD_CACHE_MAX_ENTRIES = int(os.getenv("KEYWORD_CACHE_MAX_ENTRIES", 512))
+KEYWORD_CACHE_TTL_HOURS = float(os.getenv("KEYWORD_CACHE_TTL_HOURS", 24))
+KEYWORD_CACHE_ON_DISK = os.getenv("KEYWORD_CACHE_ON_DISK", "false" if IS_VERCEL else "true").lower() == "true"
+KEYWORD_CACHE_MAX_DISK_ENTRIES = int(os.getenv("KEYWORD_CACHE_MAX_DISK_ENTRIES", 5000))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1024))
+RESULT_CACHE_TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", 6))
+
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", 25))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 5))
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_DB_PATH = Path(os.getenv("JOB_DB_PATH", str(TEMP_DIR / "jobs.sqlite3")))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
+MODEL_RECHECK_SECONDS = float(os.getenv("MODEL_RECHECK_SECONDS", 300))
+LLM_BACKENDS = ("gemini", "stub")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", 800))
+STUB_LATENCY_JITTER_MS = float(os.getenv("STUB_LATENCY_JITTER_MS", 200))
+STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", 50))
+STUB_OUTPUT_TOKENS = int(os.getenv("STUB_OUTPUT_TOKENS", 300))
+STUB_FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", 0))
+STUB_SEED = int(os.getenv("STUB_SEED", 0))
 RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", 10))
+LLM_RATE_LIMIT_PER_MINUTE = int(os.getenv("LLM_RATE_LIMIT_CALLS_PER_MINUTE", 30))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory" if IS_VERCEL else "sqlite").lower()
+RATE_LIMIT_DB_PATH = Path(os.getenv("RATE_LIMIT_DB_PATH", str(TEMP_DIR / "ratelimit.sqlite3")))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 32))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 8))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+OPTIMIZER_MODES = ("chain", "single_pass")
+DEFAULT_OPTIMIZER_MODE = os.getenv("OPTIMIZER_MODE", "chain").lower()
+JOB_DESCRIPTION_MAX_TOKENS = int(os.getenv("JOB_DESCRIPTION_MAX_TOKENS", 1500))
+RESUME_SECTION_MAX_TOKENS = int(os.getenv("RESUME_SECTION_MAX_TOKENS", 2500))
+COVER_LETTER_RESUME_MAX_TOKENS = int(os.getenv("COVER_LETTER_RESUME_MAX_TOKENS", 1500))
+
+ATS_MAX_TERMS = int(os.getenv("ATS_MAX_TERMS", 25))
+KEYWORD_TIMEOUT_SECONDS = float(os.getenv("KEYWORD_TIMEOUT_SECONDS", 15))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FILE = os.getenv("LOG_FILE", "resumate.log")
 LOG_TO_FILE = os.getenv("LOG_TO_FILE", "false" if IS_VERCEL else "true").lower() == "true"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
 
 OUTPUT_FILE_LABELS = {
     "resume": "Optimized Resume",
@@ -60,16 +121,19 @@ OUTPUT_FILE_LABELS = {
 
 
 def configure_logging() -> logging.Logger:
+    """Send records through a queue so console and file writes never block a request."""
     handlers: list[logging.Handler] = [logging.StreamHandler()]
     if LOG_TO_FILE:
         handlers.append(logging.FileHandler(LOG_FILE))
 
-    logging.basicConfig(
+    start_queue_logging(
+        handlers,
         level=getattr(logging, LOG_LEVEL),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=handlers,
+        log_format=LOG_FORMAT,
+        sample_rate=LOG_SAMPLE_RATE,
+        queue_size=LOG_QUEUE_SIZE,
     )
-    
+
     # Silence noisy external loggers to prevent spam and infinite loops
     logging.getLogger("watchfiles.main").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from datetime import datetime
+
+from .artifacts import ArtifactStore, DiskArtifactStore
+from .config import logger
+from .jobs import JobStore
+
+
+class Janitor:
+    """Periodically evicts expired artifacts and finished jobs in the background.
+
+    Each sweep runs off the event loop and is driven by the stores' expiry
+    indexes, so its cost scales with what expires rather than what is stored.
+    """
+
+    def __init__(
+        self,
+        artifact_store: ArtifactStore,
+        job_store: JobStore,
+        interval_seconds: float,
+        job_max_age_seconds: float,
+    ):
+        self.artifact_store = artifact_store
+        self.job_store = job_store
+        self.interval_seconds = interval_seconds
+        self.job_max_age_seconds = job_max_age_seconds
+        self.sweeps = 0
+        self.jobs_purged_total = 0
+        self.last_sweep_at: datetime | None = None
+        self.last_sweep_ms: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="artifact-janitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def sweep(self) -> None:
+        started = time.perf_counter()
+        await asyncio.to_thread(self.artifact_store.sweep)
+        purged_jobs = await asyncio.to_thread(self.job_store.purge_older_than, self.job_max_age_seconds)
+        if purged_jobs:
+            logger.info(f"Cleaned up {purged_jobs} finished jobs")
+
+        self.sweeps += 1
+        self.jobs_purged_total += purged_jobs
+        self.last_sweep_at = datetime.now()
+        self.last_sweep_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _run(self) -> None:
+        if isinstance(self.artifact_store, DiskArtifactStore):
+            # One-off walk for files written before the indexed blob layout.
+            try:
+                await asyncio.to_thread(self.artifact_store.cleanup_legacy_files)
+            except Exception as exc:
+                logger.error(f"Legacy file cleanup failed: {exc}")
+
+        while True:
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.error(f"Janitor sweep failed: {exc}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "sweeps": self.sweeps,
+            "jobs_purged_total": self.jobs_purged_total,
+            "last_sweep_at": self.last_sweep_at.isoformat() if self.last_sweep_at else None,
+            "last_sweep_ms": self.last_sweep_ms,
+        }
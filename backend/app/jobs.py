@@ -0,0 +1,403 @@
+import asyncio
+import io
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from .artifacts import ArtifactStore
+from .budget import track_token_usage
+from .config import logger
+from .logs import bind_request_id
+from .metrics import track_stage_timings
+from .optimizer import ResumeOptimizer
+from .processing import (
+    Stage,
+    build_optimization_stages,
+    compare_ats_scores,
+    pipeline_mode,
+    run_stage_graph,
+    save_output_files,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    resume_bytes BLOB,
+    job_description TEXT NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'chain',
+    result TEXT,
+    error TEXT,
+    status_code INTEGER,
+    owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at);
+"""
+
+
+class JobStore:
+    """SQLite-backed job records, including the upload until the job finishes."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            if "mode" not in columns:
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN mode TEXT NOT NULL DEFAULT 'chain'")
+            if "owner" not in columns:
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN lease_expires REAL")
+
+    def create(
+        self,
+        filename: str,
+        content_type: str,
+        resume_bytes: bytes,
+        job_description: str,
+        mode: str = "chain",
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT INTO jobs (id, status, stage, filename, content_type, file_size,
+                                  resume_bytes, job_description, mode, created_at, updated_at)
+                VALUES (?, 'queued', 'queued', ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, filename, content_type, len(resume_bytes), resume_bytes, job_description, mode, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> sqlite3.Row | None:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT * FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+
+    def update(self, job_id: str, owner: str | None = None, **fields) -> bool:
+        """Set `fields` on a job; with `owner`, only while that worker holds it."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        condition = "id = ?" if owner is None else "id = ? AND owner = ?"
+        params = (job_id,) if owner is None else (job_id, owner)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE {condition}",
+                (*fields.values(), *params),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> sqlite3.Row | None:
+        """Atomically move a queued job to running under `owner`.
+
+        Returns the job, or None if it is gone or another worker (possibly in
+        another process sharing the database) claimed it first.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                """
+                UPDATE jobs SET status = 'running', stage = 'started', owner = ?, lease_expires = ?, updated_at = ?
+                WHERE id = ? AND status = 'queued'
+                """,
+                (owner, now + lease_seconds, now, job_id),
+            )
+            if cursor.rowcount != 1:
+                return None
+            return self._connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend `owner`'s lease on a running job; False if it has lost it."""
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def pending_ids(self) -> list[str]:
+        """Queued jobs plus running ones whose lease expired, oldest first.
+
+        A running job with a live lease belongs to a worker that is still
+        heartbeating, here or in another process, and is left alone.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, owner = NULL, lease_expires = NULL
+                WHERE status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)
+                """,
+                (time.time(),),
+            )
+            rows = self._connection.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def purge_older_than(self, max_age_seconds: float) -> int:
+        """Drop finished jobs whose generated files have aged out."""
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (time.time() - max_age_seconds,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class JobQueue:
+    """Bounded pool of asyncio workers that run optimize jobs from the store."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        optimizer: ResumeOptimizer,
+        file_extractors: dict[str, callable],
+        artifact_store: ArtifactStore,
+        workers: int,
+        lease_seconds: float = 60,
+    ):
+        self.store = store
+        self.optimizer = optimizer
+        self.artifact_store = artifact_store
+        self.file_extractors = file_extractors
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[str] | None = None
+        self._queued: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start workers and resume anything left over from the last run."""
+        self._queue = asyncio.Queue()
+        pending = await self._enqueue_pending()
+        if pending:
+            logger.info(f"Resuming {pending} queued jobs")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._recover_expired(), name="job-lease-recovery"))
+
+    async def stop(self) -> None:
+        """Cancel workers; interrupted jobs are picked up again on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def submit(
+        self,
+        filename: str,
+        content_type: str,
+        resume_bytes: bytes,
+        job_description: str,
+        mode: str = "chain",
+    ) -> str:
+        job_id = await asyncio.to_thread(
+            self.store.create, filename, content_type, resume_bytes, job_description, mode
+        )
+        self._enqueue(job_id)
+        logger.info(f"Queued job {job_id}")
+        return job_id
+
+    def _enqueue(self, job_id: str) -> None:
+        if job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _enqueue_pending(self) -> int:
+        pending = await asyncio.to_thread(self.store.pending_ids)
+        for job_id in pending:
+            self._enqueue(job_id)
+        return len(pending)
+
+    async def _recover_expired(self) -> None:
+        """Requeue jobs whose worker stopped renewing its lease (e.g. a crashed process)."""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self._enqueue_pending()
+            except Exception as exc:
+                logger.error(f"Job lease recovery failed: {exc}")
+
+    async def _hold_lease(self, job_id: str) -> None:
+        """Renew this worker's lease on `job_id` until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, self.owner, self.lease_seconds):
+                logger.warning(f"Lost lease on job {job_id}")
+                return
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception as exc:
+                logger.error(f"Job worker crashed on {job_id}: {exc}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.claim, job_id, self.owner, self.lease_seconds)
+        if job is None:
+            return
+
+        bind_request_id(job_id)
+        logger.info(f"Running job {job_id}")
+        lease = asyncio.create_task(self._hold_lease(job_id), name=f"job-lease-{job_id}")
+        try:
+            await self._run_claimed(job)
+        finally:
+            lease.cancel()
+            await asyncio.gather(lease, return_exceptions=True)
+
+    async def _run_claimed(self, job: sqlite3.Row) -> None:
+        job_id = job["id"]
+        usage = track_token_usage()
+        timings = track_stage_timings()
+        stages = self._track_progress(
+            job_id,
+            build_optimization_stages(
+                self.optimizer,
+                stored_upload(job, with_content=True),
+                self.file_extractors,
+                job["job_description"],
+                mode=job["mode"],
+            ),
+        )
+
+        try:
+            results = await run_stage_graph(stages)
+            ats = compare_ats_scores(job["job_description"], results)
+            await self._update(job_id, stage="saving_files")
+            file_names = await save_output_files(
+                self.optimizer,
+                self.artifact_store,
+                results["optimized_resume"],
+                results["cover_letter"],
+            )
+        except HTTPException as exc:
+            await self._fail(job_id, exc.detail, exc.status_code)
+            return
+        except Exception as exc:
+            await self._fail(job_id, f"Processing error: {exc}", 500)
+            return
+
+        result = {
+            "keywords": results["keywords"],
+            "file_names": file_names,
+            "ai_powered": self.optimizer.use_gemini,
+            "token_usage": usage.as_dict(),
+            "mode": pipeline_mode(results),
+            "timings": timings.as_dict(),
+            "ats": ats,
+        }
+        if await self._update(
+            job_id,
+            status="succeeded",
+            stage="completed",
+            progress=1.0,
+            result=json.dumps(result),
+            resume_bytes=None,
+            lease_expires=None,
+        ):
+            logger.info(f"Job {job_id} completed")
+
+    def _track_progress(self, job_id: str, stages: dict[str, Stage]) -> dict[str, Stage]:
+        """Wrap each stage so finishing it advances the job's progress."""
+        completed: list[str] = []
+        total = len(stages) + 1
+
+        def tracked(name: str, stage: Stage) -> Stage:
+            async def run(**inputs):
+                result = await stage.run(**inputs)
+                completed.append(name)
+                await self._update(job_id, stage=name, progress=round(len(completed) / total, 2))
+                return result
+
+            return Stage(stage.depends_on, run)
+
+        return {name: tracked(name, stage) for name, stage in stages.items()}
+
+    async def _update(self, job_id: str, **fields) -> bool:
+        """Write job fields off the loop, only while this worker still owns the job."""
+        updated = await asyncio.to_thread(self.store.update, job_id, self.owner, **fields)
+        if not updated:
+            logger.warning(f"Job {job_id} was reclaimed by another worker; dropping update")
+        return updated
+
+    async def _fail(self, job_id: str, message: str, status_code: int) -> None:
+        logger.error(f"Job {job_id} failed: {message}")
+        await self._update(
+            job_id,
+            status="failed",
+            stage="failed",
+            error=message,
+            status_code=status_code,
+            resume_bytes=None,
+            lease_expires=None,
+        )
+
+
+def stored_upload(job: sqlite3.Row, with_content: bool = False) -> UploadFile:
+    """Rebuild an UploadFile from a stored job so the shared helpers can use it."""
+    content = job["resume_bytes"] if with_content else b""
+    return UploadFile(
+        file=io.BytesIO(content or b""),
+        filename=job["filename"],
+        size=job["file_size"],
+        headers=Headers({"content-type": job["content_type"]}),
+    )
+
+
+def job_status_payload(job: sqlite3.Row) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+        "mode": job["mode"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+def job_result(job: sqlite3.Row) -> dict:
+    return json.loads(job["result"])
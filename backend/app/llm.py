@@ -0,0 +1,546 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterator
+
+import google.generativeai as genai
+from fastapi import HTTPException
+from google.api_core import exceptions as google_exceptions
+
+from .config import (
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_TIMEOUT_SECONDS,
+    STUB_FAILURE_RATE,
+    STUB_LATENCY_JITTER_MS,
+    STUB_LATENCY_MS,
+    STUB_OUTPUT_TOKENS,
+    STUB_SEED,
+    STUB_TOKENS_PER_SECOND,
+    logger,
+)
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.Aborted,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError,
+)
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, RETRYABLE_ERRORS)
+
+
+class LLMBackend:
+    """A text generator the optimizer calls through `LLMClient`.
+
+    Both methods block; the client runs them on its worker pool.
+    """
+
+    name = "base"
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        yield self.generate(prompt)
+
+    def probe(self) -> None:
+        """Raise if the backend cannot currently serve requests."""
+        self.generate("test")
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+    def probe(self) -> None:
+        self.model.generate_content(
+            "test",
+            generation_config=genai.types.GenerationConfig(max_output_tokens=1),
+        )
+
+
+class StubBackend(LLMBackend):
+    """Offline stand-in for Gemini with configurable latency and failures.
+
+    Output is derived from a hash of the prompt, so the same prompt always gets
+    the same text; single-pass prompts get a valid JSON answer. Each call waits
+    out a time-to-first-token, then emits whole words at `tokens_per_second`.
+    Failures are drawn from a seeded generator and raise the same retryable
+    error Gemini does when overloaded, so retries and the circuit breaker can be
+    exercised too.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        latency_seconds: float = STUB_LATENCY_MS / 1000,
+        latency_jitter_seconds: float = STUB_LATENCY_JITTER_MS / 1000,
+        tokens_per_second: float = STUB_TOKENS_PER_SECOND,
+        output_tokens: int = STUB_OUTPUT_TOKENS,
+        failure_rate: float = STUB_FAILURE_RATE,
+        seed: int = STUB_SEED,
+    ):
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        text = self._respond(prompt)
+        self._first_token()
+        if self.tokens_per_second > 0:
+            time.sleep(len(re.findall(r"\S+\s*", text)) / self.tokens_per_second)
+        return text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        text = self._respond(prompt)
+        self._first_token()
+        for index, token in enumerate(re.findall(r"\S+\s*", text)):
+            if index and self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+            yield token
+
+    def probe(self) -> None:
+        return None
+
+    def _first_token(self) -> None:
+        with self._lock:
+            jitter = self._random.uniform(-self.latency_jitter_seconds, self.latency_jitter_seconds)
+            failed = self._random.random() < self.failure_rate
+        time.sleep(max(0.0, self.latency_seconds + jitter))
+        if failed:
+            raise google_exceptions.ServiceUnavailable("stub backend simulated failure")
+
+    def _respond(self, prompt: str) -> str:
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        vocabulary = sorted(set(re.findall(r"[A-Za-z][A-Za-z+#.-]{2,}", prompt))) or ["lorem", "ipsum"]
+
+        def words(count: int) -> str:
+            return " ".join(rng.choice(vocabulary) for _ in range(max(1, count)))
+
+        if "single JSON object" in prompt:
+            third = self.output_tokens // 3
+            return json.dumps({
+                "keywords": rng.sample(vocabulary, min(10, len(vocabulary))),
+                "optimized_resume": words(third),
+                "cover_letter": words(third),
+            })
+        return words(self.output_tokens)
+
+
+class LatencyHistogram:
+    """Cumulative latency buckets plus a window of recent samples for quantiles."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS, window: int = 500):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            self._recent.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip((*self.buckets, float("inf")), self.counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            recent = list(self._recent)
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total_seconds, 3),
+            "buckets": buckets,
+            "p50_seconds": round(statistics.median(recent), 3) if recent else None,
+            "p95_seconds": round(self.quantile(0.95), 3) if recent else None,
+        }
+
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures and lets a trial call through later.
+
+    While open, callers should skip the model entirely and serve demo output,
+    so an outage costs nothing per request instead of a full retry cycle. Once
+    the reset period has passed, exactly one caller is admitted as the trial;
+    everyone else keeps getting demo output until that call settles the state.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = LLM_BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allows_requests(self) -> bool:
+        """Whether a new call could be admitted now; does not claim the trial."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._trial_in_flight)
+
+    @contextmanager
+    def admitted(self) -> Iterator[bool]:
+        """Yield whether this caller may call the model, claiming the half-open trial.
+
+        A trial that leaves without recording a result (a non-retryable error
+        or a cancelled request) hands the trial to the next caller.
+        """
+        with self._lock:
+            state = self.state
+            trial = state == "half_open" and not self._trial_in_flight
+            if trial:
+                self._trial_in_flight = True
+        try:
+            yield state == "closed" or trial
+        finally:
+            if trial:
+                with self._lock:
+                    self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("AI circuit breaker closed")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            reopening = self.opened_at is not None and self.state == "half_open"
+            if reopening or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self._trial_in_flight = False
+                logger.warning(
+                    f"AI circuit breaker opened after {self.consecutive_failures} failures; "
+                    f"serving demo output for {self.reset_seconds}s"
+                )
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class LLMClient:
+    """Runs blocking model calls on a bounded pool with retries and hedging.
+
+    Transient errors are retried with full-jitter exponential backoff. When
+    hedging is on and enough latencies have been seen, a call still running at
+    the observed p95 gets a duplicate, if a slot is free, and the first answer
+    wins. Timeouts are not retried: the slow attempt keeps its slot until it
+    drains, and hedging is the tool for the tail.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout_seconds: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base_seconds: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = LLM_BACKOFF_MAX_SECONDS,
+        hedge_enabled: bool = LLM_HEDGE_ENABLED,
+        hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self.first_chunk_latency = LatencyHistogram()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="resumate-llm",
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def generate(self, call: Callable[[], str]) -> str:
+        """Run `call` with retries, hedging and breaker bookkeeping."""
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                text = await self._attempt_with_hedge(call)
+            except asyncio.TimeoutError as exc:
+                self.timeouts += 1
+                self.breaker.record_failure()
+                logger.error(f"AI generation timed out after {self.timeout_seconds}s")
+                raise HTTPException(status_code=504, detail="AI generation timed out") from exc
+            except Exception as exc:
+                if not is_retryable(exc):
+                    self.failures += 1
+                    logger.error(f"AI generation error: {exc}")
+                    raise HTTPException(status_code=500, detail=f"AI generation error: {exc}") from exc
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self.breaker.allows_requests():
+                    self.failures += 1
+                    logger.error(f"AI generation failed after {attempt + 1} attempts: {exc}")
+                    raise HTTPException(status_code=503, detail=f"AI service unavailable: {exc}") from exc
+                await self._backoff(attempt, exc)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return text
+
+    async def stream(self, produce: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+        """Stream chunks from `produce`, retrying only before the first chunk.
+
+        The timeout applies to the gap between chunks, so long answers are fine
+        as long as the model keeps producing. Closing the iterator early tells
+        the worker thread to stop pulling chunks.
+        """
+        self.calls += 1
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            delivered = False
+            try:
+                async for chunk in self._stream_once(produce):
+                    if not delivered:
+                        delivered = True
+                        self.first_chunk_latency.observe(time.perf_counter() - started)
+                    yield chunk
+            except HTTPException:
+                self.timeouts += 1
+                self.breaker.record_failure()
+                raise
+            except Exception as exc:
+                retryable = is_retryable(exc)
+                if retryable:
+                    self.breaker.record_failure()
+                if delivered or not retryable or attempt >= self.max_retries or not self.breaker.allows_requests():
+                    self.failures += 1
+                    logger.error(f"AI streaming error: {exc}")
+                    raise HTTPException(status_code=500, detail=f"AI generation error: {exc}") from exc
+                await self._backoff(attempt, exc)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return
+
+    async def _attempt_with_hedge(self, call: Callable[[], str]) -> str:
+        primary = await self._submit(call)
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return await asyncio.wait_for(asyncio.shield(primary), timeout=self.timeout_seconds)
+
+        deadline = time.monotonic() + self.timeout_seconds
+        done, _ = await asyncio.wait({primary}, timeout=min(hedge_delay, self.timeout_seconds))
+        if done or self._slots.locked():
+            # Never queue a hedge behind real work: only duplicate into a free slot.
+            return await asyncio.wait_for(asyncio.shield(primary), timeout=max(0.0, deadline - time.monotonic()))
+
+        self.hedges += 1
+        hedge = await self._submit(call)
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                raise asyncio.TimeoutError()
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _hedge_delay(self) -> float | None:
+        if not self.hedge_enabled or self.latency.count < self.hedge_min_samples:
+            return None
+        return self.latency.quantile(0.95)
+
+    async def _submit(self, call: Callable[[], str]) -> asyncio.Future:
+        """Start `call` on the pool. A slot is held until the worker thread
+        actually finishes, so a call that times out still counts against the
+        concurrency cap while it drains."""
+        await self._slots.acquire()
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+
+        def timed():
+            started = time.perf_counter()
+            result = call()
+            self.latency.observe(time.perf_counter() - started)
+            return result
+
+        try:
+            future = loop.run_in_executor(self._executor, timed)
+        except Exception:
+            self.in_flight -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        return future
+
+    async def _stream_once(self, produce: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+        await self._slots.acquire()
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def publish(item) -> None:
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                stopped.set()
+
+        def run() -> None:
+            try:
+                for chunk in produce():
+                    if stopped.is_set():
+                        return
+                    publish((chunk, None))
+            except Exception as exc:
+                publish((None, exc))
+            finally:
+                publish((None, None))
+
+        try:
+            future = loop.run_in_executor(self._executor, run)
+        except Exception:
+            self.in_flight -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+
+        try:
+            while True:
+                try:
+                    chunk, error = await asyncio.wait_for(chunks.get(), timeout=self.timeout_seconds)
+                except asyncio.TimeoutError as exc:
+                    logger.error(f"AI stream stalled for {self.timeout_seconds}s")
+                    raise HTTPException(status_code=504, detail="AI generation timed out") from exc
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            stopped.set()
+
+    async def _backoff(self, attempt: int, exc: BaseException) -> None:
+        self.retries += 1
+        delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt))
+        logger.warning(f"Transient AI error ({exc}); retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _release_slot(self, future) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        if not future.cancelled():
+            # Mark late failures as retrieved once the caller has given up on them.
+            future.exception()
+
+    def shutdown(self) -> None:
+        """Stop accepting AI work and let in-flight calls finish."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "max_retries": self.max_retries,
+            "hedging": self.hedge_enabled,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "breaker": self.breaker.status(),
+            "latency": self.latency.as_dict(),
+            "first_chunk_latency": self.first_chunk_latency.as_dict(),
+        }
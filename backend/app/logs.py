@@ -0,0 +1,176 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+REQUEST_ID_HEADER = "X-Request-ID"
+VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+# Pass as `extra=` on high-volume lines so LOG_SAMPLE_RATE can thin them out.
+SAMPLED = {"sample": True}
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sample"}
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def bind_request_id(request_id: str | None = None) -> str:
+    """Tag log records from this task and its children with `request_id`."""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+def error_response(status_code: int, message: str, headers: dict[str, str] | None = None) -> JSONResponse:
+    """The app's JSON error body, tagged with the current request ID."""
+    return JSONResponse(
+        status_code=status_code,
+        headers=headers,
+        content={
+            "error": True,
+            "message": message,
+            "status_code": status_code,
+            "request_id": current_request_id(),
+            "timestamp": datetime.now().isoformat(),
+        },
+    )
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request ID and samples records in the caller's thread.
+
+    The request ID lives in a ContextVar, so it has to be read before the
+    record crosses to the listener thread. Records marked with `SAMPLED` below
+    WARNING are kept with probability `sample_rate`.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (
+            self.sample_rate < 1
+            and getattr(record, "sample", False)
+            and record.levelno < logging.WARNING
+            and random.random() >= self.sample_rate
+        ):
+            self.sampled_out += 1
+            return False
+        request_id = _request_id.get()
+        if request_id:
+            record.request_id = request_id
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records as they are, leaving all formatting to the listener.
+
+    The stock handler renders the message in `prepare` so records survive a
+    trip to another process; this queue is in-process, so the caller's cost is
+    one `put_nowait`. A full queue drops the record instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def start_queue_logging(
+    handlers: list[logging.Handler],
+    level: int,
+    log_format: str = "json",
+    sample_rate: float = 1.0,
+    queue_size: int = 10000,
+) -> DeferredQueueHandler:
+    """Route the root logger through a queue drained by a listener thread.
+
+    `handlers` do the slow I/O on the listener thread; the listener is stopped
+    (and the queue flushed) at interpreter exit.
+    """
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(
+        TEXT_FORMAT,
+        defaults={"request_id": "-"},
+    )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = DeferredQueueHandler(queue.Queue(maxsize=max(0, queue_size)))
+    queue_handler.addFilter(ContextFilter(sample_rate))
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    return queue_handler
+
+
+class RequestIdMiddleware:
+    """Binds a request ID for logging and echoes it in the response headers.
+
+    A well-formed incoming X-Request-ID (from a proxy or the client) is kept so
+    logs can be joined across hops; otherwise a new one is generated.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = Headers(scope=scope).get(REQUEST_ID_HEADER, "")
+        request_id = bind_request_id(incoming if VALID_REQUEST_ID.match(incoming) else None)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
@@ -0,0 +1,259 @@
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, NamedTuple
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Snapshot(NamedTuple):
+    """A metric read from a component's stats at scrape time."""
+
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[dict[str, str], float]]
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(dict(zip(self.label_names, key)))} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = STAGE_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(zip(self.label_names, key))
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                    cumulative += bucket_count
+                    bucket_labels = format_labels({**labels, "le": format_value(bound)})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(round(total, 6))}")
+                lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    Each worker process keeps its own registry, so scrape every worker (or
+    the single process) rather than a load balancer in front of several.
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def counter(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def gauge(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help, label_names))
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, snapshots: Iterable[Snapshot] = ()) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for snapshot in snapshots:
+            lines.append(f"# HELP {snapshot.name} {snapshot.help}")
+            lines.append(f"# TYPE {snapshot.name} {snapshot.kind}")
+            for labels, value in snapshot.samples:
+                lines.append(f"{snapshot.name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+HTTP_REQUESTS = registry.counter(
+    "resumate_http_requests_total",
+    "HTTP requests by endpoint, method and status code.",
+    ("endpoint", "method", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "resumate_http_request_duration_seconds",
+    "Time from receiving a request to sending its last byte.",
+    ("endpoint",),
+)
+HTTP_IN_FLIGHT = registry.gauge("resumate_http_requests_in_flight", "HTTP requests being handled.")
+STAGE_DURATION = registry.histogram(
+    "resumate_stage_duration_seconds",
+    "Duration of each pipeline stage.",
+    ("stage",),
+)
+STAGE_IN_FLIGHT = registry.gauge("resumate_stage_in_flight", "Pipeline stages currently running.", ("stage",))
+STAGE_ERRORS = registry.counter("resumate_stage_errors_total", "Pipeline stages that raised.", ("stage",))
+
+
+class StageTimings:
+    """Wall-clock time one request spent in each stage.
+
+    Stages that run more than once (rendering each document, for example) are
+    summed, and stages that overlap are each counted in full.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+        }
+
+
+_current_timings: ContextVar[StageTimings | None] = ContextVar("stage_timings", default=None)
+
+
+def track_stage_timings() -> StageTimings:
+    """Start timing the stages that run in this task and its children."""
+    timings = StageTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_stage_timings() -> StageTimings | None:
+    return _current_timings.get()
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Time a block into the stage histogram and the current request's timings."""
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    started = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        raise
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.record(stage, elapsed)
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request, labelled by the matched endpoint.
+
+    Labelling by endpoint function rather than raw path keeps cardinality flat
+    for routes such as /download/{filename}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=scope["method"], status=str(status))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
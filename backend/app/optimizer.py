@@ -1,76 +1,172 @@
-import io
+import asyncio
+import json
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Callable
 
-import PyPDF2
-import google.generativeai as genai
-from docx import Document
 from fastapi import HTTPException
 
+from .budget import (
+    condense_job_description,
+    condense_resume_for_cover_letter,
+    dedupe_lines,
+    record_fallback,
+    record_token_usage,
+    split_resume_sections,
+)
+from .cache import ContentCache, job_description_key
 from .config import (
     ALLOWED_FILE_TYPES,
+    ATS_MAX_TERMS,
     GEMINI_API_KEY,
+    GEMINI_MODEL_NAME,
+    KEYWORD_TIMEOUT_SECONDS,
+    LLM_BACKEND,
+    LLM_BACKENDS,
     MAX_FILE_SIZE_MB,
+    MODEL_RECHECK_SECONDS,
     RATE_LIMIT_PER_MINUTE,
     logger,
 )
-
-
-def initialize_model():
-    """Initialize Gemini once so the rest of the app can ask for AI content."""
-    if not GEMINI_API_KEY:
-        logger.warning("GEMINI_API_KEY not found in .env file. AI features will be disabled.")
-        logger.warning("Get a key from https://makersuite.google.com/ and add it to your .env file.")
-        return None
-
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        model.generate_content(
-            "test",
-            generation_config=genai.types.GenerationConfig(max_output_tokens=1),
-        )
-        logger.info("Gemini AI initialized and tested successfully.")
-        return model
-    except Exception as exc:
-        logger.error("Failed to initialize Gemini AI. Please check your API key and configuration.")
-        logger.error(f"Error details: {exc}")
-        logger.warning("AI features will be disabled. The application will run in demo mode.")
-        return None
-
-
-class ResumeOptimizer:
-    """Owns the domain logic for extracting and generating resume content."""
-
-    def __init__(self, model):
-        self.model = model
-        self.use_gemini = model is not None
-
-    def extract_text_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF uploads."""
+from .llm import GeminiBackend, LLMBackend, LLMClient, StubBackend
+from .logs import SAMPLED
+from .rendering import DocxRenderer
+from .scoring import extract_local_keywords
+
+
+class ModelManager:
+    """Owns the LLM backend and checks its readiness in the background.
+
+    Building the Gemini model is local, so requests may use it right away while
+    the first probe is still in flight. Only a failed probe switches requests
+    to demo mode, and the periodic recheck switches them back once Gemini
+    answers. The stub backend needs no key and is always ready.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = GEMINI_API_KEY,
+        model_name: str = GEMINI_MODEL_NAME,
+        recheck_seconds: float = MODEL_RECHECK_SECONDS,
+        backend: str = LLM_BACKEND,
+    ):
+        if backend not in LLM_BACKENDS:
+            logger.warning(f"Unknown LLM_BACKEND '{backend}', using gemini")
+            backend = "gemini"
+        self.backend = backend
+        self.api_key = api_key
+        self.model_name = model_name if backend == "gemini" else backend
+        self.recheck_seconds = recheck_seconds
+        self.last_checked: datetime | None = None
+        self.last_error: str | None = None
+        self._model: LLMBackend | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+        if backend == "stub":
+            self.state = "ready"
+            self._model = StubBackend()
+            logger.warning("Using the stub LLM backend; responses are simulated.")
+            return
+
+        self.state = "unverified" if api_key else "disabled"
+        if not api_key:
+            logger.warning("GEMINI_API_KEY not found in .env file. AI features will be disabled.")
+            logger.warning("Get a key from https://makersuite.google.com/ and add it to your .env file.")
+
+    @property
+    def model(self) -> LLMBackend | None:
+        """The backend to use for the current request, or None for demo mode."""
+        if self.state not in ("unverified", "ready"):
+            return None
+        return self._ensure_model()
+
+    def _ensure_model(self) -> LLMBackend:
+        if self._model is None:
+            self._model = GeminiBackend(self.api_key, self.model_name)
+        return self._model
+
+    def probe(self) -> None:
+        """Make a one-token call and record whether Gemini is reachable."""
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            return "\n".join(page.extract_text() or "" for page in pdf_reader.pages).strip()
+            self._ensure_model().probe()
+            if self.state != "ready":
+                logger.info("Gemini AI initialized and tested successfully.")
+            self.state = "ready"
+            self.last_error = None
         except Exception as exc:
-            logger.error(f"PDF extraction error: {exc}")
-            raise HTTPException(status_code=400, detail=f"Error reading PDF: {exc}") from exc
+            if self.state != "unavailable":
+                logger.error("Failed to initialize Gemini AI. Please check your API key and configuration.")
+                logger.error(f"Error details: {exc}")
+                logger.warning("AI features will be disabled until the next successful check.")
+            self.state = "unavailable"
+            self.last_error = str(exc)
+        finally:
+            self.last_checked = datetime.now()
+
+    def start(self) -> None:
+        """Begin probing on a daemon thread; never blocks startup or shutdown.
+
+        The SDK has no per-call deadline, so a hung probe must not be able to
+        hold the interpreter open at exit.
+        """
+        if self.state == "disabled" or self.backend == "stub" or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._monitor, name="gemini-readiness", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread = None
+
+    def _monitor(self) -> None:
+        while not self._stopped.is_set():
+            self.probe()
+            self._stopped.wait(self.recheck_seconds)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "backend": self.backend,
+            "model": self.model_name,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_error": self.last_error,
+        }
 
-    def extract_text_from_docx(self, file_content: bytes) -> str:
-        """Extract text from DOCX uploads."""
-        try:
-            doc = Document(io.BytesIO(file_content))
-            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
-        except Exception as exc:
-            logger.error(f"DOCX extraction error: {exc}")
-            raise HTTPException(status_code=400, detail=f"Error reading DOCX: {exc}") from exc
 
-    def generate_ai_content(self, prompt: str) -> str:
-        """Generate text through Gemini, or return a useful demo response."""
-        try:
-            if self.use_gemini:
-                response = self.model.generate_content(prompt)
-                return response.text
+class ResumeOptimizer:
+    """Owns the domain logic for extracting and generating resume content."""
 
-            return f"""
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        llm: LLMClient | None = None,
+        keyword_cache: ContentCache | None = None,
+        renderer: DocxRenderer | None = None,
+        keyword_timeout_seconds: float = KEYWORD_TIMEOUT_SECONDS,
+    ):
+        self.model_manager = model_manager
+        self.llm = llm or LLMClient()
+        self.keyword_cache = keyword_cache
+        self.renderer = renderer or DocxRenderer()
+        self.keyword_timeout_seconds = keyword_timeout_seconds
+        self.keyword_fallbacks = 0
+
+    @property
+    def model(self):
+        """The live model, or None in demo mode or while the circuit breaker is open."""
+        if not self.llm.breaker.allows_requests():
+            return None
+        return self.model_manager.model
+
+    @property
+    def use_gemini(self) -> bool:
+        """Decided per call, so a recovered or failed model takes effect immediately."""
+        return self.model is not None
+
+    def demo_response(self) -> str:
+        return f"""
             # AI Service Configuration Required
 
             This is a demonstration response. To get actual AI-powered optimization:
@@ -86,13 +182,55 @@ class ResumeOptimizer:
 
             The system will provide real AI-powered resume optimization once properly configured.
             """
-        except Exception as exc:
-            logger.error(f"AI generation error: {exc}")
-            raise HTTPException(status_code=500, detail=f"AI generation error: {exc}") from exc
 
-    def extract_keywords(self, job_description: str) -> str:
-        """Extract ATS keywords that matter for the target role."""
-        prompt = f"""
+    async def generate_ai_content_async(self, prompt: str) -> str:
+        """Run a generation through the resilient client without blocking the loop.
+
+        Callers the circuit breaker does not admit get the demo response.
+        """
+        with self.llm.breaker.admitted() as allowed:
+            model = self.model_manager.model if allowed else None
+            if model is None:
+                text = self.demo_response()
+            else:
+                text = await self.llm.generate(lambda: model.generate(prompt))
+        record_token_usage(prompt, text)
+        return text
+
+    async def stream_ai_content_async(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a generation from the worker pool into the event loop."""
+        streamed = []
+        try:
+            with self.llm.breaker.admitted() as allowed:
+                model = self.model_manager.model if allowed else None
+                if model is None:
+                    chunks = self._demo_stream()
+                else:
+                    chunks = self.llm.stream(lambda: model.stream(prompt))
+                async for chunk in chunks:
+                    streamed.append(chunk)
+                    yield chunk
+        finally:
+            record_token_usage(prompt, "".join(streamed))
+
+    async def _demo_stream(self) -> AsyncIterator[str]:
+        for line in self.demo_response().splitlines(keepends=True):
+            yield line
+
+    def shutdown(self) -> None:
+        """Stop accepting AI work and let in-flight calls finish."""
+        self.llm.shutdown()
+
+    async def stream_text_async(self, prompt: str, on_text: Callable[[str], None]) -> str:
+        """Pass each streamed chunk to `on_text` and return the full text."""
+        parts = []
+        async for chunk in self.stream_ai_content_async(prompt):
+            parts.append(chunk)
+            on_text(chunk)
+        return "".join(parts)
+
+    def build_keywords_prompt(self, job_description: str) -> str:
+        return f"""
         Analyze the following job description and extract the most important ATS (Applicant Tracking System) keywords and phrases that should be included in a resume. Focus on:
         1. Technical skills and technologies
         2. Required qualifications and certifications
@@ -101,25 +239,36 @@ class ResumeOptimizer:
         5. Job titles and roles mentioned
 
         Job Description:
-        {job_description}
+        {condense_job_description(job_description)}
 
         Please provide a comprehensive list of keywords and phrases that would help a resume pass ATS screening for this position. Format the response as a clean, organized list.
         """
-        return self.generate_ai_content(prompt)
 
-    def optimize_resume(self, original_resume: str, job_description: str, keywords: str) -> str:
-        """Produce an improved resume while keeping the candidate's facts intact."""
-        prompt = f"""
+    def build_optimize_prompt(
+        self,
+        original_resume: str,
+        job_description: str,
+        keywords: str,
+        part: tuple[int, int] | None = None,
+    ) -> str:
+        """Build the optimize prompt; `part` is (index, total) for one resume section."""
+        resume_label = "ORIGINAL RESUME"
+        if part is not None:
+            resume_label = (
+                f"ORIGINAL RESUME (part {part[0]} of {part[1]}; optimize and return only this part, "
+                "without adding sections that belong to other parts)"
+            )
+        return f"""
         You are an expert resume writer and ATS optimization specialist. Please optimize the following resume to better match the job description while maintaining truthfulness and the candidate's authentic experience.
 
-        ORIGINAL RESUME:
+        {resume_label}:
         {original_resume}
 
         JOB DESCRIPTION:
-        {job_description}
+        {condense_job_description(job_description)}
 
         ATS KEYWORDS TO INTEGRATE:
-        {keywords}
+        {dedupe_lines(keywords)}
 
         OPTIMIZATION INSTRUCTIONS:
         1. Maintain all factual information about the candidate's experience
@@ -133,11 +282,9 @@ class ResumeOptimizer:
 
         Please return only the optimized resume content, properly formatted and ready to use. Do not include any additional commentary or explanations.
         """
-        return self.generate_ai_content(prompt)
 
-    def generate_cover_letter(self, optimized_resume: str, job_description: str) -> str:
-        """Generate the matching cover letter for the same application."""
-        prompt = f"""
+    def build_cover_letter_prompt(self, optimized_resume: str, job_description: str) -> str:
+        return f"""
         Based on the following optimized resume and job description, create a compelling, personalized cover letter that:
 
         1. Addresses the specific role and company
@@ -148,25 +295,185 @@ class ResumeOptimizer:
         6. Uses a professional, confident tone
 
         OPTIMIZED RESUME:
-        {optimized_resume}
+        {condense_resume_for_cover_letter(optimized_resume)}
 
         JOB DESCRIPTION:
-        {job_description}
+        {condense_job_description(job_description)}
 
         Please create a complete cover letter that would accompany this resume. Include placeholders like [Company Name], [Hiring Manager Name], [Your Name] where specific details would need to be customized. Format it as a professional business letter.
         """
-        return self.generate_ai_content(prompt)
 
-    def create_docx_from_text(self, content: str, title: str) -> bytes:
-        """Turn generated plain text into a DOCX download."""
-        doc = Document()
-        doc.add_heading(title, 0)
-        for paragraph in content.split("\n"):
-            if paragraph.strip():
-                doc.add_paragraph(paragraph)
-
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-        return file_stream.getvalue()
+    async def extract_keywords_async(self, job_description: str) -> str:
+        """Extract ATS keywords that matter for the target role.
+
+        Waits at most `keyword_timeout_seconds` for the model before using the
+        local TF-IDF keywords instead.
+        """
+        if not self.use_gemini:
+            return self.local_keywords(job_description, "AI unavailable")
+        cache_key, keywords = self._cached_keywords(job_description)
+        if keywords is None:
+            try:
+                keywords = await asyncio.wait_for(
+                    self.generate_ai_content_async(self.build_keywords_prompt(job_description)),
+                    self.keyword_timeout_seconds or None,
+                )
+            except asyncio.TimeoutError:
+                return self.local_keywords(job_description, f"no answer within {self.keyword_timeout_seconds}s")
+            except HTTPException as exc:
+                return self.local_keywords(job_description, exc.detail)
+            self._store_keywords(cache_key, keywords)
+        return keywords
+
+    def local_keywords(self, job_description: str, reason: str) -> str:
+        """Keywords from local TF-IDF scoring, used when the model cannot answer."""
+        self.keyword_fallbacks += 1
+        record_fallback()
+        logger.warning(f"Using local keywords: {reason}")
+        return extract_local_keywords(job_description, ATS_MAX_TERMS)
+
+    def _cached_keywords(self, job_description: str) -> tuple[str | None, str | None]:
+        # Demo output is never cached so it cannot outlive a newly added API key.
+        if self.keyword_cache is None or not self.use_gemini:
+            return None, None
+        cache_key = job_description_key(job_description)
+        return cache_key, self.keyword_cache.get(cache_key)
+
+    def _store_keywords(self, cache_key: str | None, keywords: str) -> None:
+        if cache_key is not None and keywords:
+            self.keyword_cache.set(cache_key, keywords)
+
+    def plan_resume_sections(self, original_resume: str) -> list[str]:
+        # Demo mode answers every prompt with the same text, so splitting would
+        # only repeat it once per section.
+        if not self.use_gemini:
+            return [original_resume]
+        return split_resume_sections(original_resume)
+
+    async def optimize_resume_async(
+        self,
+        original_resume: str,
+        job_description: str,
+        keywords: str,
+        on_text: Callable[[str], None] | None = None,
+    ) -> str:
+        """Produce an improved resume while keeping the candidate's facts intact.
+
+        Resumes over the section budget are optimized section by section in
+        parallel and stitched back together in order. With `on_text`, a single
+        section streams its tokens and multiple sections are reported as each
+        one, in order, is ready.
+        """
+        sections = self.plan_resume_sections(original_resume)
+        if len(sections) == 1:
+            prompt = self.build_optimize_prompt(original_resume, job_description, keywords)
+            if on_text is None:
+                return await self.generate_ai_content_async(prompt)
+            return await self.stream_text_async(prompt, on_text)
+
+        logger.info("Optimizing resume in %d sections", len(sections), extra=SAMPLED)
+        tasks = [
+            asyncio.ensure_future(
+                self.generate_ai_content_async(
+                    self.build_optimize_prompt(section, job_description, keywords, part=(index, len(sections)))
+                )
+            )
+            for index, section in enumerate(sections, start=1)
+        ]
+        try:
+            optimized_sections = []
+            for task in tasks:
+                optimized = (await task).strip()
+                optimized_sections.append(optimized)
+                if on_text is not None:
+                    on_text(optimized + "\n\n")
+            return "\n\n".join(optimized_sections)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_cover_letter_async(
+        self,
+        optimized_resume: str,
+        job_description: str,
+        on_text: Callable[[str], None] | None = None,
+    ) -> str:
+        """Generate the matching cover letter for the same application."""
+        prompt = self.build_cover_letter_prompt(optimized_resume, job_description)
+        if on_text is None:
+            return await self.generate_ai_content_async(prompt)
+        return await self.stream_text_async(prompt, on_text)
+
+    def build_single_pass_prompt(self, original_resume: str, job_description: str) -> str:
+        return f"""
+        You are an expert resume writer and ATS optimization specialist. In one response, extract the ATS keywords from the job description, optimize the resume for them, and write the matching cover letter.
+
+        ORIGINAL RESUME:
+        {original_resume}
+
+        JOB DESCRIPTION:
+        {condense_job_description(job_description)}
 
+        INSTRUCTIONS:
+        1. Keywords: the technical skills, qualifications, industry terms, competencies and job titles an ATS would screen for
+        2. Optimized resume: keep every fact about the candidate's experience, integrate the keywords naturally, use strong action verbs, quantify achievements where possible, and keep the same overall length and structure
+        3. Cover letter: 3-4 paragraphs in a professional, confident tone, highlighting the most relevant qualifications, with placeholders like [Company Name], [Hiring Manager Name], [Your Name]
+
+        Respond with a single JSON object and nothing else, using exactly these keys:
+        {{"keywords": ["keyword", ...], "optimized_resume": "plain text", "cover_letter": "plain text"}}
+        """
+
+    async def optimize_single_pass_async(self, original_resume: str, job_description: str) -> dict | None:
+        """Produce keywords, resume and cover letter from one structured call.
+
+        Returns None when the mode does not apply (demo mode, or a resume long
+        enough to need sections), the call fails (timeout, transport error, open
+        breaker) or the answer fails validation, so callers can fall back to the
+        three-call chain.
+        """
+        if not self.use_gemini or len(self.plan_resume_sections(original_resume)) > 1:
+            return None
+
+        try:
+            text = await self.generate_ai_content_async(
+                self.build_single_pass_prompt(original_resume, job_description)
+            )
+        except HTTPException as exc:
+            logger.warning(f"Single-pass call failed, falling back to the call chain: {exc.detail}")
+            return None
+        try:
+            return parse_single_pass_response(text)
+        except ValueError as exc:
+            logger.warning(f"Single-pass response rejected, falling back to the call chain: {exc}")
+            return None
+
+    def create_docx_from_text(self, content: str, title: str) -> bytes:
+        """Turn generated text into a DOCX download, styling its markdown."""
+        return self.renderer.render(content, title)
+
+
+def parse_single_pass_response(text: str) -> dict:
+    """Validate a single-pass answer into keywords, optimized_resume and cover_letter."""
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.split("\n", 1)[-1].rsplit("```", 1)[0]
+    start, end = body.find("{"), body.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in response")
+    try:
+        payload = json.loads(body[start:end + 1])
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON: {exc}") from exc
+
+    keywords = payload.get("keywords")
+    if isinstance(keywords, list):
+        keywords = "\n".join(str(keyword).strip() for keyword in keywords if str(keyword).strip())
+    result = {
+        "keywords": keywords,
+        "optimized_resume": payload.get("optimized_resume"),
+        "cover_letter": payload.get("cover_letter"),
+    }
+    for key, value in result.items():
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"missing or empty '{key}'")
+    return {key: value.strip() for key, value in result.items()}
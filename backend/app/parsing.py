@@ -0,0 +1,225 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+from docx import Document
+from fastapi import HTTPException
+
+from .cache import ContentCache
+from .config import MAX_PDF_PAGES, PARSE_TIMEOUT_SECONDS, PARSE_WORKERS, logger
+
+
+class DocumentParseError(Exception):
+    """Raised inside a parse worker; carries only a message so it always pickles."""
+
+
+def open_source(source: bytes | str):
+    """Parsers take either the upload bytes or the path of its spill file."""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def parse_pdf(source: bytes | str, max_pages: int) -> str:
+    """Extract text from a PDF, refusing documents over the page limit."""
+    try:
+        pdf_reader = PyPDF2.PdfReader(open_source(source))
+        page_count = len(pdf_reader.pages)
+        if max_pages and page_count > max_pages:
+            raise DocumentParseError(f"PDF has {page_count} pages; the limit is {max_pages}")
+        return "\n".join(page.extract_text() or "" for page in pdf_reader.pages).strip()
+    except DocumentParseError:
+        raise
+    except Exception as exc:
+        raise DocumentParseError(str(exc)) from None
+
+
+def parse_docx(source: bytes | str) -> str:
+    try:
+        doc = Document(open_source(source))
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
+    except Exception as exc:
+        raise DocumentParseError(str(exc)) from None
+
+
+def report_worker_pid(worker_pids) -> None:
+    """Pool initializer: tell the parent which process to kill if this one hangs."""
+    worker_pids.put(os.getpid())
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """Start parse workers without forking the threaded server process.
+
+    Forking copies whatever locks the logging, SQLite and LLM threads hold at
+    that instant. The fork server is a clean process that imports this module
+    once and forks workers from there; spawn is the fallback where it is missing.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class DocumentParser:
+    """Runs PDF and DOCX extraction in a process pool with a per-parse deadline.
+
+    PyPDF2 and python-docx are pure Python, so parsing in threads serializes on
+    the GIL. Submissions are gated to one per worker so the deadline covers
+    parsing only, never time spent queued behind other uploads. A parse that
+    overruns its deadline means a worker is stuck on a malformed file; the pool is killed and rebuilt, and parses that were
+    sharing it are retried once on the fresh pool. With zero workers (or where
+    processes cannot be started, as on Vercel) parsing falls back to threads,
+    where a timed-out parse is abandoned rather than killed.
+
+    Extracted text is cached by the upload's SHA-256, so re-uploading the same
+    file with a different job description skips parsing entirely.
+    """
+
+    def __init__(
+        self,
+        workers: int = PARSE_WORKERS,
+        timeout_seconds: float = PARSE_TIMEOUT_SECONDS,
+        max_pdf_pages: int = MAX_PDF_PAGES,
+        text_cache: ContentCache | None = None,
+    ):
+        self.workers = max(0, workers)
+        self.timeout_seconds = timeout_seconds
+        self.max_pdf_pages = max_pdf_pages
+        self.text_cache = text_cache
+        self.parses = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._worker_pids: dict[ProcessPoolExecutor, multiprocessing.queues.SimpleQueue] = {}
+        self._lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+
+    @property
+    def mode(self) -> str:
+        return "process" if self.workers else "thread"
+
+    async def extract_pdf(self, source: bytes | str, digest: str | None = None) -> str:
+        return await self._parse("PDF", digest, parse_pdf, source, self.max_pdf_pages)
+
+    async def extract_docx(self, source: bytes | str, digest: str | None = None) -> str:
+        return await self._parse("DOCX", digest, parse_docx, source)
+
+    async def _parse(self, kind: str, digest: str | None, parse, *args) -> str:
+        """Parse under the deadline; `digest` is the upload's SHA-256 cache key."""
+        if digest and self.text_cache is not None:
+            cached = self.text_cache.get(digest)
+            if cached is not None:
+                return cached
+
+        self.parses += 1
+        try:
+            text = await self._run_with_deadline(parse, *args)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            logger.error(f"{kind} extraction timed out after {self.timeout_seconds}s")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error reading {kind}: the document took too long to parse",
+            ) from exc
+        except DocumentParseError as exc:
+            logger.error(f"{kind} extraction error: {exc}")
+            raise HTTPException(status_code=400, detail=f"Error reading {kind}: {exc}") from exc
+
+        if digest and self.text_cache is not None:
+            self.text_cache.set(digest, text)
+        return text
+
+    async def _run_with_deadline(self, parse, *args) -> str:
+        if not self.workers:
+            return await asyncio.wait_for(asyncio.to_thread(parse, *args), self.timeout_seconds)
+
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            for attempt in range(2):
+                executor = self._pool()
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(executor, parse, *args),
+                        self.timeout_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    self._restart(executor)
+                    raise
+                except BrokenProcessPool:
+                    # Another parse's timeout killed the pool under this one.
+                    self._restart(executor)
+                    if attempt:
+                        raise DocumentParseError("parser worker exited unexpectedly") from None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = worker_context()
+                worker_pids = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=report_worker_pid,
+                    initargs=(worker_pids,),
+                )
+                self._worker_pids[self._executor] = worker_pids
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """Kill every worker of `executor` and let the next parse build a new pool.
+
+        The executor has no public way to stop a running task, so workers are
+        killed by the PIDs they reported when they started.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.pool_restarts += 1
+            worker_pids = self._worker_pids.pop(executor)
+        while not worker_pids.empty():
+            try:
+                os.kill(worker_pids.get(), getattr(signal, "SIGKILL", signal.SIGTERM))
+            except ProcessLookupError:
+                pass
+        worker_pids.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Restarted the document parser pool after a stuck parse")
+
+    def check_available(self) -> None:
+        """Fall back to thread parsing where worker processes cannot start."""
+        if not self.workers:
+            return
+        try:
+            error = self._pool().submit(parse_docx, b"").exception(timeout=self.timeout_seconds)
+            if isinstance(error, BrokenProcessPool):
+                raise error
+        except Exception as exc:
+            logger.warning(f"Process parsing unavailable, parsing in threads instead: {exc}")
+            self.shutdown()
+            self.workers = 0
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            worker_pids = self._worker_pids.pop(executor, None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if worker_pids is not None:
+            worker_pids.close()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "timeout_seconds": self.timeout_seconds,
+            "max_pdf_pages": self.max_pdf_pages,
+            "parses": self.parses,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool_restarts,
+        }
@@ -1,6 +1,8 @@
-import zipfile
+import asyncio
+import json
+import uuid
 from datetime import datetime
-from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple
 
 from fastapi import HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
@@ -8,33 +10,46 @@ from fastapi.responses import JSONResponse
 from .config import (
     ALLOWED_CONTENT_TYPES,
     ALLOWED_FILE_TYPES,
+    ATS_MAX_TERMS,
+    DEFAULT_OPTIMIZER_MODE,
     FILE_TYPE_MAPPING,
     MAX_FILE_SIZE,
     MAX_FILE_SIZE_MB,
     MIN_JOB_DESCRIPTION_LENGTH,
     MIN_RESUME_TEXT_LENGTH,
+    OPTIMIZER_MODES,
     OUTPUT_FILE_LABELS,
-    TEMP_DIR,
     logger,
 )
+from .artifacts import ArtifactStore, build_zip
+from .budget import track_token_usage
+from .cache import ContentCache, content_hash, job_description_key
+from .logs import SAMPLED
+from .metrics import current_stage_timings, time_stage, track_stage_timings
 from .optimizer import ResumeOptimizer
+from .parsing import DocumentParser
+from .scoring import score_match
+from .uploads import IngestedUpload, ingest_upload
 
 
-def build_file_extractors(optimizer: ResumeOptimizer) -> dict[str, callable]:
+def build_file_extractors(parser: DocumentParser) -> dict[str, callable]:
     """Map content types to the extractor that knows how to read them."""
     return {
-        FILE_TYPE_MAPPING["pdf"]: optimizer.extract_text_from_pdf,
-        FILE_TYPE_MAPPING["docx"]: optimizer.extract_text_from_docx,
+        FILE_TYPE_MAPPING["pdf"]: parser.extract_pdf,
+        FILE_TYPE_MAPPING["docx"]: parser.extract_docx,
     }
 
 
 def log_upload_request(resume_file: UploadFile, job_description: str) -> None:
-    """Log upload metadata in a single, consistent format."""
-    logger.info("Upload request received")
-    logger.info(f"File name: {resume_file.filename or 'None'}")
-    logger.info(f"File type: {resume_file.content_type or 'None'}")
-    logger.info(f"File size: {resume_file.size or 0} bytes")
-    logger.info(f"Job description length: {len(job_description or '')} chars")
+    """Log upload metadata as one sampled, lazily formatted record."""
+    logger.info(
+        "Upload request received: file=%s type=%s size=%d bytes job_description=%d chars",
+        resume_file.filename,
+        resume_file.content_type,
+        resume_file.size or 0,
+        len(job_description or ""),
+        extra=SAMPLED,
+    )
 
 
 def validate_upload_request(resume_file: UploadFile, job_description: str) -> str:
@@ -76,14 +91,27 @@ def validate_upload_request(resume_file: UploadFile, job_description: str) -> st
 async def extract_resume_text(
     resume_file: UploadFile,
     file_extractors: dict[str, callable],
+    upload: IngestedUpload | None = None,
 ) -> str:
-    """Read the uploaded file and extract text with one content-type lookup."""
+    """Read the uploaded file and extract text with one content-type lookup.
+
+    An `upload` the caller already ingested is parsed as is and left open for
+    the caller to close.
+    """
     extractor = file_extractors.get(resume_file.content_type)
     if extractor is None:
         raise HTTPException(status_code=422, detail="Unsupported file type")
 
-    file_content = await resume_file.read()
-    original_resume_text = extractor(file_content).strip()
+    owned = upload is None
+    if owned:
+        with time_stage("read"):
+            upload = await ingest_upload(resume_file)
+    try:
+        with time_stage("parse"):
+            original_resume_text = (await extractor(upload.source, upload.digest)).strip()
+    finally:
+        if owned:
+            upload.close()
 
     if not original_resume_text:
         raise HTTPException(
@@ -100,61 +128,503 @@ async def extract_resume_text(
     return original_resume_text
 
 
-def save_output_files(
+class Stage(NamedTuple):
+    """One step of the pipeline and the named stages whose results it consumes."""
+
+    depends_on: tuple[str, ...]
+    run: Callable[..., Awaitable]
+
+
+async def run_stage_graph(stages: dict[str, Stage]) -> dict[str, object]:
+    """Run each stage as soon as its dependencies finish.
+
+    Independent stages overlap. The first failure cancels everything still
+    running and is re-raised unchanged, so HTTPExceptions keep their status.
+    Cancelling the graph cancels its stages and waits for them to stop.
+    """
+    for name, stage in stages.items():
+        unknown = [dependency for dependency in stage.depends_on if dependency not in stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {unknown}")
+
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run_stage(stage: Stage):
+        inputs = {dependency: await tasks[dependency] for dependency in stage.depends_on}
+        return await stage.run(**inputs)
+
+    for name, stage in stages.items():
+        tasks[name] = asyncio.create_task(run_stage(stage), name=f"stage:{name}")
+
+    try:
+        done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        # Nobody will read the results; stop the AI calls and renders too.
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    failures = [task.exception() for task in done if task.exception() is not None]
+    if failures:
+        raise failures[0]
+
+    return {name: task.result() for name, task in tasks.items()}
+
+
+def build_optimization_stages(
     optimizer: ResumeOptimizer,
-    optimized_resume: str,
-    cover_letter: str,
-) -> dict[str, Path]:
-    """Persist generated files so the API can return download URLs."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_paths = {
-        "resume": TEMP_DIR / f"optimized_resume_{timestamp}.docx",
-        "cover_letter": TEMP_DIR / f"cover_letter_{timestamp}.docx",
-        "zip": TEMP_DIR / f"resumate_documents_{timestamp}.zip",
+    resume_file: UploadFile,
+    file_extractors: dict[str, callable],
+    job_description: str,
+    emit: Callable[[str, dict], None] | None = None,
+    mode: str = "chain",
+    upload: IngestedUpload | None = None,
+) -> dict[str, Stage]:
+    """Describe the optimize pipeline; keywords need only the job description.
+
+    When `emit` is given, stages report progress through it and the two long
+    generations stream their tokens instead of returning all at once.
+
+    In "single_pass" mode one structured call produces all three outputs once
+    the resume is parsed. Each later stage reuses its part of that answer and
+    falls back to its own call when the single pass did not apply or failed
+    validation.
+    """
+
+    async def parse_resume():
+        return await extract_resume_text(resume_file, file_extractors, upload)
+
+    async def extract_keywords(single_pass: dict | None = None):
+        if single_pass:
+            keywords = single_pass["keywords"]
+        else:
+            logger.info("Extracting keywords from job description", extra=SAMPLED)
+            with time_stage("llm_keywords"):
+                keywords = await optimizer.extract_keywords_async(job_description)
+        if emit:
+            emit("keywords", {"keywords": keywords, "count": len(keywords.splitlines())})
+        return keywords
+
+    def forward(event: str) -> Callable[[str], None] | None:
+        if emit is None:
+            return None
+        return lambda text: emit(event, {"text": text})
+
+    def forward_whole(event: str, text: str) -> str:
+        if emit is not None:
+            emit(event, {"text": text})
+        return text
+
+    async def optimize(resume_text: str, keywords: str, single_pass: dict | None = None):
+        if single_pass:
+            return forward_whole("resume_token", single_pass["optimized_resume"])
+        logger.info("Optimizing resume", extra=SAMPLED)
+        with time_stage("llm_optimize"):
+            return await optimizer.optimize_resume_async(
+                resume_text,
+                job_description,
+                keywords,
+                on_text=forward("resume_token"),
+            )
+
+    async def write_cover_letter(optimized_resume: str, single_pass: dict | None = None):
+        if single_pass:
+            return forward_whole("cover_letter_token", single_pass["cover_letter"])
+        logger.info("Generating cover letter", extra=SAMPLED)
+        with time_stage("llm_cover_letter"):
+            return await optimizer.generate_cover_letter_async(
+                optimized_resume,
+                job_description,
+                on_text=forward("cover_letter_token"),
+            )
+
+    async def run_single_pass(resume_text: str):
+        logger.info("Optimizing resume in a single structured call", extra=SAMPLED)
+        with time_stage("llm_single_pass"):
+            return await optimizer.optimize_single_pass_async(resume_text, job_description)
+
+    if mode == "single_pass":
+        return {
+            "resume_text": Stage((), parse_resume),
+            "single_pass": Stage(("resume_text",), run_single_pass),
+            "keywords": Stage(("single_pass",), extract_keywords),
+            "optimized_resume": Stage(("resume_text", "keywords", "single_pass"), optimize),
+            "cover_letter": Stage(("optimized_resume", "single_pass"), write_cover_letter),
+        }
+
+    return {
+        "resume_text": Stage((), parse_resume),
+        "keywords": Stage((), extract_keywords),
+        "optimized_resume": Stage(("resume_text", "keywords"), optimize),
+        "cover_letter": Stage(("optimized_resume",), write_cover_letter),
     }
 
-    file_contents = {
-        "resume": optimizer.create_docx_from_text(optimized_resume, OUTPUT_FILE_LABELS["resume"]),
-        "cover_letter": optimizer.create_docx_from_text(cover_letter, OUTPUT_FILE_LABELS["cover_letter"]),
+
+def compare_ats_scores(job_description: str, results: dict) -> dict:
+    """Local ATS match of the uploaded resume and of the optimized one."""
+    with time_stage("ats_score"):
+        before = score_match(job_description, results["resume_text"], ATS_MAX_TERMS)
+        after = score_match(job_description, results["optimized_resume"], ATS_MAX_TERMS)
+    return {
+        "before": before.as_dict(),
+        "after": after.as_dict(),
+        "improvement": round(after.score - before.score, 1),
     }
 
-    for key in ("resume", "cover_letter"):
-        with open(file_paths[key], "wb") as file_handle:
-            file_handle.write(file_contents[key])
 
-    with zipfile.ZipFile(file_paths["zip"], "w", zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.write(file_paths["resume"], file_paths["resume"].name)
-        zip_file.write(file_paths["cover_letter"], file_paths["cover_letter"].name)
+def result_cache_key(resume_digest: str, job_description: str, mode: str, model_name: str) -> str:
+    """Identify a request by what determines its output, not by who sent it."""
+    return content_hash(resume_digest, job_description_key(job_description), mode, model_name)
 
-    return file_paths
 
+def cached_result(result_cache: ContentCache, artifact_store: ArtifactStore, key: str) -> dict | None:
+    """A memoized result whose files can all still be downloaded."""
+    return result_cache.get(
+        key,
+        is_valid=lambda result: all(artifact_store.exists(name) for name in result["file_names"].values()),
+    )
 
-def build_success_response(
+
+async def run_optimization(
+    optimizer: ResumeOptimizer,
+    artifact_store: ArtifactStore,
+    resume_file: UploadFile,
+    file_extractors: dict[str, callable],
+    job_description: str,
+    mode: str = "chain",
+    result_cache: ContentCache | None = None,
+    cache_key: str | None = None,
+    emit: Callable[[str, dict], None] | None = None,
+    upload: IngestedUpload | None = None,
+) -> dict:
+    """Run the pipeline, save the files and return the stored result fields.
+
+    The result is memoized under `cache_key` only when every output came from
+    the model; demo answers and local keyword fallbacks are not reused.
+    `emit` receives stage progress as in `build_optimization_stages`, and an
+    already ingested `upload` is parsed instead of reading `resume_file` again.
+    """
+    usage = track_token_usage()
+    results = await run_stage_graph(
+        build_optimization_stages(
+            optimizer,
+            resume_file,
+            file_extractors,
+            job_description,
+            emit=emit,
+            mode=mode,
+            upload=upload,
+        )
+    )
+    ats = compare_ats_scores(job_description, results)
+    file_names = await save_output_files(
+        optimizer,
+        artifact_store,
+        results["optimized_resume"],
+        results["cover_letter"],
+    )
+    timings = current_stage_timings()
+    result = {
+        "keywords": results["keywords"],
+        "file_names": file_names,
+        "ai_powered": optimizer.use_gemini,
+        "token_usage": usage.as_dict(),
+        "mode": pipeline_mode(results),
+        "timings": timings.as_dict() if timings else None,
+        "ats": ats,
+    }
+    if result_cache is not None and cache_key and result["ai_powered"] and not usage.fallbacks:
+        result_cache.set(cache_key, result)
+    return result
+
+
+def pipeline_mode(results: dict) -> str:
+    """Name the mode that actually produced `results`, after any fallback."""
+    return "single_pass" if results.get("single_pass") else "chain"
+
+
+def validate_optimizer_mode(mode: str | None) -> str:
+    mode = (mode or DEFAULT_OPTIMIZER_MODE).strip().lower()
+    if mode not in OPTIMIZER_MODES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid mode. Choose one of: {', '.join(OPTIMIZER_MODES)}",
+        )
+    return mode
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_optimization_events(
+    request: Request,
+    resume_file: UploadFile,
+    run_pipeline: Callable[[Callable[[str, dict], None]], Awaitable[tuple[dict, str]]],
+) -> AsyncIterator[str]:
+    """Yield SSE frames as the pipeline progresses, then its result as `files`.
+
+    `run_pipeline(emit)` returns the stored result fields and how the result
+    cache served them. A caller that joins an identical run already in flight
+    gets no token events, only the final `files` event.
+
+    Errors after the stream has started cannot change the HTTP status, so they
+    are delivered as a final `error` event with the status they would have had.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    pipeline = asyncio.create_task(run_pipeline(lambda event, data: events.put_nowait((event, data))))
+    pipeline.add_done_callback(lambda _: events.put_nowait(None))
+
+    try:
+        yield format_sse("stage", {"stage": "started"})
+        while (item := await events.get()) is not None:
+            yield format_sse(*item)
+
+        result, cache = pipeline.result()
+        logger.info("Streaming processing completed successfully (result cache %s)", cache, extra=SAMPLED)
+        yield format_sse("files", result_payload(request, resume_file, result, cache))
+    except HTTPException as exc:
+        logger.error(f"Streaming error: {exc.detail}")
+        yield format_sse("error", {"message": exc.detail, "status_code": exc.status_code})
+    except Exception as exc:
+        logger.error(f"Unexpected streaming error: {exc}")
+        yield format_sse("error", {"message": f"Processing error: {exc}", "status_code": 500})
+    finally:
+        pipeline.cancel()
+
+
+def render_docx(optimizer: ResumeOptimizer, text: str, label: str) -> tuple[str, bytes]:
+    with time_stage("render_docx"):
+        return ".docx", optimizer.create_docx_from_text(text, label)
+
+
+def store_documents(artifact_store: ArtifactStore, documents: dict, bundle: bool) -> dict[str, str]:
+    with time_stage("save"):
+        return artifact_store.put_documents(documents, "resumate_documents" if bundle else None)
+
+
+async def save_output_files(
+    optimizer: ResumeOptimizer,
+    artifact_store: ArtifactStore,
+    optimized_resume: str,
+    cover_letter: str,
+    bundle: bool = True,
+) -> dict[str, str]:
+    """Store generated files so the API can return download URLs.
+
+    Both documents render concurrently in worker threads and are stored off
+    the event loop. `bundle=False` skips the per-result ZIP for callers that
+    build their own.
+    """
+    documents = dict(zip(
+        ("optimized_resume", "cover_letter"),
+        await asyncio.gather(
+            asyncio.to_thread(render_docx, optimizer, optimized_resume, OUTPUT_FILE_LABELS["resume"]),
+            asyncio.to_thread(render_docx, optimizer, cover_letter, OUTPUT_FILE_LABELS["cover_letter"]),
+        ),
+    ))
+    names = await asyncio.to_thread(store_documents, artifact_store, documents, bundle)
+    file_names = {"resume": names["optimized_resume"], "cover_letter": names["cover_letter"]}
+    if bundle:
+        file_names["zip"] = names["zip"]
+    return file_names
+
+
+async def run_batch_optimization(
+    optimizer: ResumeOptimizer,
+    artifact_store: ArtifactStore,
+    resume_file: UploadFile,
+    file_extractors: dict[str, callable],
+    job_descriptions: list[str],
+    concurrency: int,
+    mode: str = "chain",
+) -> tuple[bytes, dict]:
+    """Tailor one resume to many job descriptions and bundle every result.
+
+    The resume is parsed once and shared by every chain. A failing job is
+    recorded in the manifest instead of sinking the batch, unless all fail.
+    """
+    batch_id = uuid.uuid4().hex[:12]
+    parse_task = asyncio.create_task(extract_resume_text(resume_file, file_extractors))
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(job_description: str) -> dict:
+        async with limit:
+            usage = track_token_usage()
+            timings = track_stage_timings()
+            stages = build_optimization_stages(
+                optimizer,
+                resume_file,
+                file_extractors,
+                job_description,
+                mode=mode,
+            )
+            stages["resume_text"] = Stage((), lambda: asyncio.shield(parse_task))
+            results = await run_stage_graph(stages)
+            ats = compare_ats_scores(job_description, results)
+            file_names = await save_output_files(
+                optimizer,
+                artifact_store,
+                results["optimized_resume"],
+                results["cover_letter"],
+                bundle=False,
+            )
+            return {
+                "keywords": results["keywords"],
+                "ats": ats,
+                "file_names": file_names,
+                "token_usage": usage.as_dict(),
+                "mode": pipeline_mode(results),
+                "timings": timings.as_dict(),
+            }
+
+    try:
+        outcomes = await asyncio.gather(
+            *(run_one(job_description) for job_description in job_descriptions),
+            return_exceptions=True,
+        )
+    finally:
+        parse_task.cancel()
+
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if len(failures) == len(outcomes):
+        raise failures[0]
+
+    # Reading every DOCX back and zipping them is blocking work; keep it off the loop.
+    return await asyncio.to_thread(bundle_batch, artifact_store, batch_id, optimizer.use_gemini, outcomes)
+
+
+def bundle_batch(
+    artifact_store: ArtifactStore,
+    batch_id: str,
+    ai_powered: bool,
+    outcomes: list[dict | BaseException],
+) -> tuple[bytes, dict]:
+    """Zip each job's documents into its own folder alongside a manifest."""
+    manifest = {"batch_id": batch_id, "ai_powered": ai_powered, "jobs": []}
+    members = {}
+    for index, outcome in enumerate(outcomes, 1):
+        folder = f"job_{index:02d}"
+        if isinstance(outcome, BaseException):
+            detail = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+            logger.error(f"Batch {batch_id} job {index} failed: {detail}")
+            manifest["jobs"].append({"folder": folder, "status": "failed", "error": detail})
+            continue
+
+        for key, arcname in (("resume", "optimized_resume.docx"), ("cover_letter", "cover_letter.docx")):
+            data = artifact_store.read(outcome["file_names"][key])
+            if data is None:
+                raise HTTPException(status_code=500, detail="Generated file expired before bundling")
+            members[f"{folder}/{arcname}"] = data
+        manifest["jobs"].append(
+            {
+                "folder": folder,
+                "status": "succeeded",
+                "keywords_extracted": len(outcome["keywords"].splitlines()),
+                "token_usage": outcome["token_usage"],
+                "mode": outcome["mode"],
+                "timings": outcome["timings"],
+                "ats": outcome["ats"],
+            }
+        )
+    members["manifest.json"] = json.dumps(manifest, indent=2).encode("utf-8")
+
+    with time_stage("zip"):
+        return build_zip(members), manifest
+
+
+def build_result_payload(
     request: Request,
     resume_file: UploadFile,
     keywords: str,
-    file_paths: dict[str, Path],
+    file_names: dict[str, str],
     ai_powered: bool,
-) -> JSONResponse:
-    """Build the API response payload in one place."""
+    token_usage: dict | None = None,
+    mode: str | None = None,
+    timings: dict | None = None,
+    ats: dict | None = None,
+    cache: str | None = None,
+) -> dict:
+    """Build the result payload shared by every optimize endpoint.
+
+    `processing_time` is the pipeline's duration in seconds and `timings`
+    breaks it down by stage; `completed_at` is when the payload was built.
+    `ats` holds the local match scores before and after optimization, and
+    `cache` says whether the result was computed ("miss"), memoized ("hit")
+    or shared with an identical request in flight ("coalesced").
+    """
     base_url = f"{request.url.scheme}://{request.url.netloc}"
     original_size_kb = round((resume_file.size or 0) / 1024, 2)
 
-    return JSONResponse(
-        {
-            "status": "success",
-            "message": "Resume optimized successfully",
-            "resume_url": f"{base_url}/download/{file_paths['resume'].name}",
-            "cover_letter_url": f"{base_url}/download/{file_paths['cover_letter'].name}",
-            "zip_url": f"{base_url}/download/{file_paths['zip'].name}",
-            "ai_powered": ai_powered,
-            "keywords_extracted": len(keywords.splitlines()) if keywords else 0,
-            "processing_time": datetime.now().isoformat(),
-            "file_info": {
-                "original_size_kb": original_size_kb,
-                "content_type": resume_file.content_type,
-                "filename": resume_file.filename,
-            },
-        }
+    return {
+        "status": "success",
+        "message": "Resume optimized successfully",
+        "resume_url": f"{base_url}/download/{file_names['resume']}",
+        "cover_letter_url": f"{base_url}/download/{file_names['cover_letter']}",
+        "zip_url": f"{base_url}/download/{file_names['zip']}",
+        "ai_powered": ai_powered,
+        "keywords_extracted": len(keywords.splitlines()) if keywords else 0,
+        "token_usage": token_usage,
+        "mode": mode,
+        "processing_time": round(timings["total_ms"] / 1000, 3) if timings else None,
+        "timings": timings,
+        "ats": ats,
+        "cache": cache,
+        "completed_at": datetime.now().isoformat(),
+        "file_info": {
+            "original_size_kb": original_size_kb,
+            "content_type": resume_file.content_type,
+            "filename": resume_file.filename,
+        },
+    }
+
+
+def result_payload(request: Request, resume_file: UploadFile, result: dict, cache: str) -> dict:
+    """`build_result_payload` for a result as `run_optimization` stores it."""
+    return build_result_payload(
+        request=request,
+        resume_file=resume_file,
+        keywords=result["keywords"],
+        file_names=result["file_names"],
+        ai_powered=result["ai_powered"],
+        token_usage=result["token_usage"],
+        mode=result["mode"],
+        timings=result["timings"],
+        ats=result["ats"],
+        cache=cache,
     )
 
+
+def build_success_response(
+    request: Request,
+    resume_file: UploadFile,
+    keywords: str,
+    file_names: dict[str, str],
+    ai_powered: bool,
+    token_usage: dict | None = None,
+    mode: str | None = None,
+    timings: dict | None = None,
+    ats: dict | None = None,
+    cache: str | None = None,
+) -> JSONResponse:
+    """Build the API response payload in one place."""
+    return JSONResponse(
+        build_result_payload(
+            request=request,
+            resume_file=resume_file,
+            keywords=keywords,
+            file_names=file_names,
+            ai_powered=ai_powered,
+            token_usage=token_usage,
+            mode=mode,
+            timings=timings,
+            ats=ats,
+            cache=cache,
+        )
+    )
@@ -0,0 +1,259 @@
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request
+
+from .config import logger
+
+# Charged up front, before the keyword cache or a single-pass fallback is known.
+AI_CALLS_PER_RESULT = {"chain": 3, "single_pass": 1}
+PRUNE_EVERY = 1000
+# How long a check waits for another worker's write lock before failing open.
+LOCK_TIMEOUT_SECONDS = 0.25
+
+
+class BucketSpec(NamedTuple):
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def per_minute(cls, amount: float) -> "BucketSpec":
+        return cls(float(amount), amount / 60)
+
+
+class BucketState(NamedTuple):
+    tokens: float
+    updated_at: float
+
+
+def settle(
+    states: dict[str, BucketState | None],
+    charges: dict[str, tuple[float, BucketSpec]],
+    now: float,
+) -> tuple[dict[str, BucketState], float]:
+    """Refill each bucket to `now` and take every charge, or none of them.
+
+    Returns the new states and 0, or no states and the seconds until the
+    emptiest bucket could cover its charge.
+    """
+    refilled = {}
+    wait = 0.0
+    for bucket, (cost, spec) in charges.items():
+        state = states.get(bucket)
+        tokens = spec.capacity if state is None else min(
+            spec.capacity,
+            state.tokens + (now - state.updated_at) * spec.refill_per_second,
+        )
+        if tokens < cost:
+            wait = max(wait, (cost - tokens) / spec.refill_per_second)
+        refilled[bucket] = tokens
+    if wait:
+        return {}, wait
+    return {bucket: BucketState(refilled[bucket] - cost, now) for bucket, (cost, _) in charges.items()}, 0.0
+
+
+def full_at(state: BucketState, spec: BucketSpec) -> float:
+    """When the bucket refills completely, after which its row can be dropped."""
+    return state.updated_at + (spec.capacity - state.tokens) / spec.refill_per_second
+
+
+class RateLimitStore:
+    """Token-bucket levels per (bucket, client)."""
+
+    backend = "base"
+    # Stores that can block (on I/O or another process) are called off the loop.
+    blocking = False
+
+    def consume(self, client: str, charges: dict[str, tuple[float, BucketSpec]], now: float) -> float:
+        """Take `charges` atomically; return 0, or the seconds to wait before retrying."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets for a single worker.
+
+    `consume` is only called from the event loop and never awaits, so the
+    read-modify-write cannot interleave with another request and needs no lock.
+    """
+
+    backend = "memory"
+
+    def __init__(self):
+        self._states: dict[tuple[str, str], tuple[BucketState, float]] = {}
+        self._calls = 0
+
+    def consume(self, client: str, charges: dict[str, tuple[float, BucketSpec]], now: float) -> float:
+        self._calls += 1
+        if self._calls % PRUNE_EVERY == 0:
+            self._states = {key: entry for key, entry in self._states.items() if entry[1] > now}
+
+        current = {bucket: self._states.get((bucket, client), (None, 0))[0] for bucket in charges}
+        updated, wait = settle(current, charges, now)
+        for bucket, state in updated.items():
+            self._states[(bucket, client)] = (state, full_at(state, charges[bucket][1]))
+        return wait
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "tracked_buckets": len(self._states)}
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Buckets in a SQLite file that every worker on the host shares.
+
+    Each check is one immediate transaction, so concurrent workers serialize
+    on the write lock instead of each enforcing the limit on its own.
+    """
+
+    backend = "sqlite"
+    blocking = True
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_limits (
+        bucket TEXT NOT NULL,
+        client TEXT NOT NULL,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        full_at REAL NOT NULL,
+        PRIMARY KEY (bucket, client)
+    );
+    CREATE INDEX IF NOT EXISTS rate_limits_full_at ON rate_limits (full_at);
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._connection = sqlite3.connect(
+            str(db_path),
+            check_same_thread=False,
+            timeout=LOCK_TIMEOUT_SECONDS,
+            isolation_level=None,
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self.SCHEMA)
+
+    def consume(self, client: str, charges: dict[str, tuple[float, BucketSpec]], now: float) -> float:
+        with self._lock:
+            self._calls += 1
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                if self._calls % PRUNE_EVERY == 0:
+                    self._connection.execute("DELETE FROM rate_limits WHERE full_at <= ?", (now,))
+                current = {}
+                for bucket in charges:
+                    row = self._connection.execute(
+                        "SELECT tokens, updated_at FROM rate_limits WHERE bucket = ? AND client = ?",
+                        (bucket, client),
+                    ).fetchone()
+                    current[bucket] = BucketState(*row) if row else None
+                updated, wait = settle(current, charges, now)
+                for bucket, state in updated.items():
+                    self._connection.execute(
+                        """
+                        INSERT INTO rate_limits (bucket, client, tokens, updated_at, full_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(bucket, client) DO UPDATE SET
+                            tokens = excluded.tokens,
+                            updated_at = excluded.updated_at,
+                            full_at = excluded.full_at
+                        """,
+                        (bucket, client, state.tokens, state.updated_at, full_at(state, charges[bucket][1])),
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            tracked = self._connection.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+        return {"backend": self.backend, "tracked_buckets": tracked}
+
+
+def create_rate_limit_store(backend: str, db_path: Path) -> RateLimitStore:
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend != "sqlite":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', falling back to sqlite")
+    try:
+        return SQLiteRateLimitStore(db_path)
+    except sqlite3.Error as exc:
+        logger.warning(f"Rate limit database unavailable, limiting per process instead: {exc}")
+        return MemoryRateLimitStore()
+
+
+def client_key(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def estimated_ai_calls(mode: str, results: int = 1) -> int:
+    return AI_CALLS_PER_RESULT.get(mode, 3) * results
+
+
+class RateLimiter:
+    """Token buckets per client: one for requests, one weighted by AI calls.
+
+    A charge larger than a bucket's capacity is capped at the capacity, so a
+    big batch needs a full bucket rather than being refused forever. Buckets
+    configured with a zero rate are not enforced.
+    """
+
+    def __init__(self, store: RateLimitStore, buckets: dict[str, BucketSpec]):
+        self.store = store
+        self.buckets = {name: spec for name, spec in buckets.items() if spec.capacity > 0}
+        self.rejections = 0
+        self.store_errors = 0
+
+    async def check(self, client: str, costs: dict[str, float]) -> None:
+        """Charge `costs` to the client's buckets or raise 429 with Retry-After.
+
+        If the shared store is locked or failing the request is let through:
+        an unavailable limiter must not turn into a 500.
+        """
+        charges = {
+            name: (min(cost, self.buckets[name].capacity), self.buckets[name])
+            for name, cost in costs.items()
+            if name in self.buckets and cost > 0
+        }
+        if not charges:
+            return
+
+        try:
+            if self.store.blocking:
+                wait = await asyncio.to_thread(self.store.consume, client, charges, time.time())
+            else:
+                wait = self.store.consume(client, charges, time.time())
+        except sqlite3.Error as exc:
+            self.store_errors += 1
+            logger.warning(f"Rate limit store unavailable, allowing request from {client}: {exc}")
+            return
+        if not wait:
+            return
+        self.rejections += 1
+        retry_after = max(1, math.ceil(wait))
+        logger.warning(f"Rate limit exceeded for {client}; retry in {retry_after}s")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded. Please try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.store.stats(),
+            "buckets": {
+                name: {"capacity": spec.capacity, "per_minute": spec.refill_per_second * 60}
+                for name, spec in self.buckets.items()
+            },
+            "rejections": self.rejections,
+            "store_errors": self.store_errors,
+        }
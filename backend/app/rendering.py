@@ -0,0 +1,123 @@
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from docx import Document
+
+from .artifacts import FIXED_ZIP_TIME
+
+DOCUMENT_PART = "word/document.xml"
+HEADING_LINE = re.compile(r"^(#{1,6})\s+(.*)$")
+BULLET_LINE = re.compile(r"^[-*•+]\s+(.*)$")
+NUMBERED_LINE = re.compile(r"^\d{1,3}[.)]\s+(.*)$")
+BOLD_LINE = re.compile(r"^\*\*([^*]+?)\*\*:?$")
+RULE_LINE = re.compile(r"^([-*_])(\s*\1){2,}$")
+INLINE_MARKUP = re.compile(r"\*\*(.+?)\*\*|__(.+?)__|(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])")
+# Characters XML 1.0 cannot carry; python-docx refuses them outright.
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]")
+
+
+def paragraph_xml(text: str, style: str | None = None) -> str:
+    """One `w:p`, with `**bold**` and `*italic*` spans turned into runs."""
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    runs = []
+    position = 0
+    for match in INLINE_MARKUP.finditer(text):
+        if match.start() > position:
+            runs.append(run_xml(text[position:match.start()]))
+        bold_text = match.group(1) or match.group(2)
+        if bold_text:
+            runs.append(run_xml(bold_text, "<w:b/>"))
+        else:
+            runs.append(run_xml(match.group(3), "<w:i/>"))
+        position = match.end()
+    if position < len(text):
+        runs.append(run_xml(text[position:]))
+    return f"<w:p>{properties}{''.join(runs)}</w:p>"
+
+
+def run_xml(text: str, formatting: str = "") -> str:
+    properties = f"<w:rPr>{formatting}</w:rPr>" if formatting else ""
+    text = escape(INVALID_XML_CHARS.sub("", text))
+    return f'<w:r>{properties}<w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def markdown_to_body_xml(content: str) -> str:
+    """Map the simple markdown LLMs emit onto template styles in one pass.
+
+    `#` headings become Heading 1-3, a line that is only bold text becomes a
+    Heading 2, `-`/`*` items become List Bullet and `1.` items List Number.
+    Everything else is a Normal paragraph; blank lines and rules are dropped.
+    """
+    paragraphs = []
+    for raw_line in content.split("\n"):
+        line = raw_line.strip()
+        if not line or RULE_LINE.match(line):
+            continue
+        if match := HEADING_LINE.match(line):
+            level = min(len(match.group(1)), 3)
+            paragraphs.append(paragraph_xml(match.group(2).strip("*# "), f"Heading{level}"))
+        elif match := BOLD_LINE.match(line):
+            paragraphs.append(paragraph_xml(match.group(1).strip(), "Heading2"))
+        elif match := BULLET_LINE.match(line):
+            paragraphs.append(paragraph_xml(match.group(1), "ListBullet"))
+        elif match := NUMBERED_LINE.match(line):
+            paragraphs.append(paragraph_xml(match.group(1), "ListNumber"))
+        else:
+            paragraphs.append(paragraph_xml(line))
+    return "".join(paragraphs)
+
+
+class DocxRenderer:
+    """Renders generated text into DOCX packages from a pre-built template.
+
+    The template (python-docx's default unless `template` is given) is loaded
+    once. Its main document part is split around the body so each render only
+    writes new paragraph XML, and every other part stays in a ZIP that is
+    already deflated: a render copies those bytes and appends one member, so
+    the ~400 KB of styles is never parsed or compressed again. Renders share
+    no mutable state and are safe to run in parallel threads.
+    """
+
+    def __init__(self, template: bytes | None = None):
+        if template is None:
+            buffer = io.BytesIO()
+            Document().save(buffer)
+            template = buffer.getvalue()
+
+        with zipfile.ZipFile(io.BytesIO(template)) as source:
+            members = {info.filename: source.read(info) for info in source.infolist()}
+        document_xml = members.pop(DOCUMENT_PART).decode("utf-8")
+        self._body_head, self._body_tail = split_body(document_xml)
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as static_parts:
+            for arcname, data in members.items():
+                static_parts.writestr(zipfile.ZipInfo(arcname, date_time=FIXED_ZIP_TIME), data, zipfile.ZIP_DEFLATED)
+        self._static_package = buffer.getvalue()
+
+    def render(self, content: str, title: str) -> bytes:
+        """Title plus markdown-styled content as a reproducible DOCX."""
+        document_xml = "".join((
+            self._body_head,
+            paragraph_xml(title, "Title"),
+            markdown_to_body_xml(content),
+            self._body_tail,
+        ))
+        buffer = io.BytesIO(self._static_package)
+        buffer.seek(0, io.SEEK_END)
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as package:
+            info = zipfile.ZipInfo(DOCUMENT_PART, date_time=FIXED_ZIP_TIME)
+            package.writestr(info, document_xml.encode("utf-8"), zipfile.ZIP_DEFLATED)
+        return buffer.getvalue()
+
+
+def split_body(document_xml: str) -> tuple[str, str]:
+    """Split the main part where new paragraphs go: after any existing body
+    content and before the final section properties, which must come last."""
+    body_end = document_xml.rindex("</w:body>")
+    section = document_xml.rfind("<w:sectPr", 0, body_end)
+    # A sectPr inside a paragraph's pPr closes an earlier section, not the body.
+    insert_at = section if section != -1 and document_xml.rfind("</w:p>", 0, body_end) < section else body_end
+    return document_xml[:insert_at], document_xml[insert_at:]
@@ -0,0 +1,172 @@
+import re
+import time
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+
+# Keeps "c++", "c#", "node.js" and "ci/cd" whole; trailing dots are trimmed.
+# Listing punctuation is matched too, so "FastAPI, Redis" is not a phrase.
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*|[,:()\[\]|&]")
+# Lines and sentences are the "documents" IDF is computed over.
+SEGMENT_BREAK = re.compile(r"[\n\r;•]+|(?<=[a-z0-9)])[.!?](?=\s)")
+HAS_LETTER = re.compile(r"[a-z]")
+STOPWORDS = frozenset(
+    """
+    a about above across after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each either etc few for from further
+    had has have having he her here hers him his how i if in into is it its itself just least less may me
+    might more most must my no nor not of off on once only or other our ours out over own per plus same she
+    should so some such than that the their theirs them then there these they this those through to too
+    under until up upon us very via was we well were what when where which while who whom why will with
+    within without would you your yours
+    ability able across apply applicant applicants candidate candidates company day days description
+    environment excellent experience familiarity good great hire hiring ideal including job knowledge looking new
+    opportunity plus position preferred proficiency proficient qualifications related required requirements
+    responsibilities role skills strong successful team understanding work working year years
+    build building built deployed develop developed developing join seeking use used using
+    """.split()
+)
+
+
+class MatchScore(NamedTuple):
+    """How well a resume covers the terms a job description weights."""
+
+    score: float
+    similarity: float
+    matched_terms: list[str]
+    missing_terms: list[str]
+    elapsed_ms: float
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+def tokenize(segment: str) -> list[str | None]:
+    """Tokens of a lowercased segment, with None where a phrase is broken."""
+    tokens: list[str | None] = []
+    for token in TOKEN.findall(segment):
+        token = token.rstrip("./-")
+        # Listing punctuation has no letters, so it also ends a phrase here.
+        if (len(token) < 2 and token not in ("c", "r")) or token in STOPWORDS or not HAS_LETTER.search(token):
+            tokens.append(None)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def segment_terms(text: str) -> list[list[str]]:
+    """Unigrams and in-phrase bigrams for each line or sentence of `text`."""
+    segments = []
+    for segment in SEGMENT_BREAK.split(text.lower()):
+        tokens = tokenize(segment)
+        terms = [token for token in tokens if token]
+        terms.extend(
+            f"{first} {second}"
+            for first, second in zip(tokens, tokens[1:])
+            if first and second and first != second
+        )
+        if terms:
+            segments.append(terms)
+    return segments
+
+
+def drop_rare_phrases(segments: list[list[str]]) -> list[list[str]]:
+    """Keep a bigram only if it recurs in another segment.
+
+    Any two adjacent words form a bigram, so one seen once is usually prose
+    ("engineer building") rather than a skill ("machine learning").
+    """
+    seen_in = Counter(term for terms in segments for term in set(terms) if " " in term)
+    return [[term for term in terms if " " not in term or seen_in[term] > 1] for terms in segments]
+
+
+class TermMatrix(NamedTuple):
+    vocabulary: dict[str, int]
+    job_counts: np.ndarray
+    resume_counts: np.ndarray
+    idf: np.ndarray
+
+
+def term_matrix(job_description: str, resume_text: str) -> TermMatrix:
+    """Term counts for both texts plus smoothed IDF over their segments.
+
+    With only two texts, document frequency across them says little, so each
+    line or sentence counts as a document: a term that recurs in every line
+    (boilerplate) is weighted below one concentrated in a few requirements.
+    """
+    job_segments = segment_terms(job_description)
+    resume_segments = segment_terms(resume_text)
+    segments = drop_rare_phrases([*job_segments, *resume_segments])
+    vocabulary: dict[str, int] = {}
+    segment_ids: list[np.ndarray] = []
+    for terms in segments:
+        segment_ids.append(np.fromiter((vocabulary.setdefault(term, len(vocabulary)) for term in terms), dtype=np.int64))
+
+    size = len(vocabulary)
+    if not size:
+        empty = np.zeros(0)
+        return TermMatrix(vocabulary, empty, empty, empty)
+    split = len(job_segments)
+    job_ids = np.concatenate(segment_ids[:split]) if split else np.zeros(0, dtype=np.int64)
+    resume_ids = np.concatenate(segment_ids[split:]) if len(segment_ids) > split else np.zeros(0, dtype=np.int64)
+    document_frequency = np.bincount(np.concatenate([np.unique(ids) for ids in segment_ids]), minlength=size)
+    idf = np.log((1 + len(segment_ids)) / (1 + document_frequency)) + 1
+    return TermMatrix(
+        vocabulary,
+        np.bincount(job_ids, minlength=size).astype(float),
+        np.bincount(resume_ids, minlength=size).astype(float),
+        idf,
+    )
+
+
+def tfidf(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """Sublinear TF-IDF, L2-normalised."""
+    weights = np.zeros_like(counts)
+    present = counts > 0
+    weights[present] = (1 + np.log(counts[present])) * idf[present]
+    norm = np.linalg.norm(weights)
+    return weights / norm if norm else weights
+
+
+def ranked_terms(vocabulary: dict[str, int], weights: np.ndarray, mask: np.ndarray, limit: int) -> list[str]:
+    """Highest-weighted terms under `mask`, leaving out words a listed phrase covers."""
+    terms = list(vocabulary)
+    selected = np.flatnonzero(mask)
+    in_phrases = {word for index in selected if " " in terms[index] for word in terms[index].split()}
+    order = selected[np.argsort(-weights[selected], kind="stable")]
+    return [terms[index] for index in order if terms[index] not in in_phrases][:limit]
+
+
+def score_match(job_description: str, resume_text: str, max_terms: int = 25) -> MatchScore:
+    """Score how well `resume_text` covers `job_description`, locally and in milliseconds.
+
+    `score` (0-100) is the share of the job description's TF-IDF weight whose
+    terms appear in the resume; `similarity` is the cosine of the two vectors.
+    Missing terms are ordered by how much weight they would add.
+    """
+    started = time.perf_counter()
+    matrix = term_matrix(job_description, resume_text)
+    job_weights = tfidf(matrix.job_counts, matrix.idf)
+    resume_weights = tfidf(matrix.resume_counts, matrix.idf)
+
+    in_job = matrix.job_counts > 0
+    in_resume = matrix.resume_counts > 0
+    job_total = job_weights.sum()
+    score = float(job_weights[in_resume].sum() / job_total * 100) if job_total else 0.0
+    similarity = float(job_weights @ resume_weights) if job_weights.size else 0.0
+
+    return MatchScore(
+        score=round(score, 1),
+        similarity=round(similarity, 3),
+        matched_terms=ranked_terms(matrix.vocabulary, job_weights, in_job & in_resume, max_terms),
+        missing_terms=ranked_terms(matrix.vocabulary, job_weights, in_job & ~in_resume, max_terms),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def extract_local_keywords(job_description: str, max_terms: int = 25) -> str:
+    """The job description's top TF-IDF terms, one per line like the LLM keyword list."""
+    matrix = term_matrix(job_description, "")
+    weights = tfidf(matrix.job_counts, matrix.idf)
+    return "\n".join(ranked_terms(matrix.vocabulary, weights, matrix.job_counts > 0, max_terms))
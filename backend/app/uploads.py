@@ -0,0 +1,167 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from .config import FILE_TYPE_MAPPING, MAX_FILE_SIZE, MAX_FILE_SIZE_MB, UPLOAD_SPOOL_MB
+from .logs import error_response
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Room for the job description and multipart framing around the file itself.
+FORM_OVERHEAD_BYTES = 1024 * 1024
+FILE_SIGNATURES = {
+    FILE_TYPE_MAPPING["pdf"]: (b"%PDF-", "PDF"),
+    FILE_TYPE_MAPPING["docx"]: (b"PK\x03\x04", "DOCX"),
+}
+
+
+class IngestedUpload:
+    """Upload bytes held in memory up to a threshold, then spilled to a temp file.
+
+    Parsers take `source`, which is the bytes while small and the spill file's
+    path once large, so process-pool workers read big uploads straight from
+    disk instead of receiving a pickled copy.
+    """
+
+    def __init__(self, spool_bytes: int):
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._memory = bytearray()
+        self._file = None
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def source(self) -> bytes | str:
+        if self._file is None:
+            return bytes(self._memory)
+        self._file.flush()
+        return self._file.name
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+
+        self._memory.extend(chunk)
+        if len(self._memory) > self.spool_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="resumate-upload-", delete=False)
+            self._file.write(self._memory)
+            self._memory = bytearray()
+
+    def read_bytes(self) -> bytes:
+        if self._file is None:
+            return bytes(self._memory)
+        self._file.flush()
+        with open(self._file.name, "rb") as file_handle:
+            return file_handle.read()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+        self._memory = bytearray()
+
+
+async def ingest_upload(
+    resume_file: UploadFile,
+    max_bytes: int = MAX_FILE_SIZE,
+    spool_bytes: int = int(UPLOAD_SPOOL_MB * 1024 * 1024),
+) -> IngestedUpload:
+    """Read an upload in chunks, enforcing the size cap and file signature.
+
+    The first chunk is checked against the declared type's magic bytes, so a
+    mislabelled file is rejected before the rest of it is read. The SHA-256 is
+    computed as chunks arrive.
+    """
+    upload = IngestedUpload(spool_bytes)
+    try:
+        first_chunk = await resume_file.read(UPLOAD_CHUNK_SIZE)
+        check_signature(resume_file.content_type, first_chunk)
+        chunk = first_chunk
+        while chunk:
+            if upload.size + len(chunk) > max_bytes:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB",
+                )
+            upload.write(chunk)
+            chunk = await resume_file.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+def check_signature(content_type: str | None, first_chunk: bytes) -> None:
+    signature = FILE_SIGNATURES.get(content_type)
+    if signature is None:
+        return
+    magic, label = signature
+    # PDF readers accept a header anywhere in the first KiB; ZIP must lead.
+    found = magic in first_chunk[:1024] if label == "PDF" else first_chunk.startswith(magic)
+    if not found:
+        raise HTTPException(
+            status_code=422,
+            detail=f"File content is not a valid {label}. Please upload the original document.",
+        )
+
+
+class RequestSizeLimitMiddleware:
+    """Stops receiving a request body once it passes `max_body_bytes`.
+
+    Starlette spools the whole multipart body before a handler runs, so without
+    this an oversized upload is received in full before it can be rejected.
+    """
+
+    def __init__(self, app, max_body_bytes: int = MAX_FILE_SIZE + FORM_OVERHEAD_BYTES):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_body_bytes:
+            await error_response(413, self._too_large_detail())(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise HTTPException(status_code=413, detail=self._too_large_detail())
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as exc:
+            # Route handlers turn this into the same body; this covers a body read
+            # outside them, which would otherwise surface as a 500.
+            if exc.status_code != 413 or response_started:
+                raise
+            await error_response(413, exc.detail)(scope, receive, send)
+
+    @staticmethod
+    def _too_large_detail() -> str:
+        return f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB"
@@ -0,0 +1,72 @@
+"""Benchmark the optimize pipeline: isolated stages, then concurrent load.
+
+Stage timings cover PDF/DOCX extraction, DOCX rendering and saving results on
+synthetic resumes of growing size. The load test drives /optimize-resume
+in-process at each concurrency level against the stub LLM backend. Results are
+written as JSON; pass an earlier file to --compare to print p50/p95 changes.
+
+    cd backend && python -m benchmarks --output bench.json
+    cd backend && python -m benchmarks --output after.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+
+from .load import configure_environment
+from .results import compare, environment, write_results
+
+
+def int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True, help="Path of the JSON results file to write")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--sizes", type=int_list, default=[2, 8, 32], help="Resume sizes in experience entries")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per stage and size")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--roles", type=int, default=8, help="Size of the uploaded resume in the load test")
+    parser.add_argument("--mode", default="chain", choices=["chain", "single_pass"])
+    parser.add_argument("--warm-caches", action="store_true", help="Keep the keyword and parsed-text caches on")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--stub-latency-ms", type=float)
+    parser.add_argument("--stub-tokens-per-second", type=float)
+    parser.add_argument("--stub-output-tokens", type=int)
+    parser.add_argument("--stub-failure-rate", type=float)
+    args = parser.parse_args()
+
+    configure_environment({
+        "STUB_LATENCY_MS": args.stub_latency_ms,
+        "STUB_TOKENS_PER_SECOND": args.stub_tokens_per_second,
+        "STUB_OUTPUT_TOKENS": args.stub_output_tokens,
+        "STUB_FAILURE_RATE": args.stub_failure_rate,
+    })
+    from .load import run_load
+    from .stages import run_stage_benchmarks
+
+    results = {"environment": environment(), "config": dict(vars(args))}
+    if not args.skip_stages:
+        results["stages"] = run_stage_benchmarks(args.sizes, args.repeat)
+        for row in results["stages"]:
+            print(json.dumps({"stage": row["stage"], "roles": row["roles"], **row["latency"]}))
+    if not args.skip_load:
+        load = asyncio.run(run_load(args.concurrency, args.requests, args.roles, args.mode, args.warm_caches))
+        results["load"] = load.pop("levels")
+        results["load_context"] = load
+        for row in results["load"]:
+            print(json.dumps({key: row[key] for key in ("concurrency", "requests_per_second", "errors")} | row["latency"]))
+
+    write_results(args.output, results)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file_handle:
+            for line in compare(json.load(file_handle), results):
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
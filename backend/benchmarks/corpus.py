@@ -0,0 +1,102 @@
+"""Synthetic resumes of growing size, as plain text, DOCX and PDF bytes."""
+
+import io
+
+from docx import Document
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes",
+    "AWS", "Terraform", "Kafka", "Airflow", "GraphQL", "React", "TypeScript",
+]
+ACHIEVEMENTS = [
+    "Built {skill} services handling {n}M requests per day",
+    "Cut p95 latency by {n}0% after profiling the {skill} hot path",
+    "Led a team of {n} engineers through a {skill} migration",
+    "Automated {skill} deployments, saving {n} hours a week",
+    "Designed the {skill} data model behind {n} customer-facing features",
+]
+PDF_LINES_PER_PAGE = 54
+PDF_LINE_CHARS = 95
+
+
+def synthetic_resume(roles: int) -> str:
+    """A plausible resume with `roles` experience entries of four bullets each."""
+    lines = [
+        "ALEX SAMPLE",
+        "Software Engineer | alex@example.com | +1 555 0100",
+        "",
+        "SUMMARY",
+        f"Engineer with {roles} roles of experience across backend, data and platform work.",
+        "",
+        "EXPERIENCE",
+    ]
+    for role in range(roles):
+        lines.append(f"Software Engineer, Company {role + 1} ({2024 - 2 * role - 2} - {2024 - 2 * role})")
+        for bullet in range(4):
+            template = ACHIEVEMENTS[(role + bullet) % len(ACHIEVEMENTS)]
+            skill = SKILLS[(role * 4 + bullet) % len(SKILLS)]
+            lines.append("- " + template.format(skill=skill, n=bullet + 2))
+        lines.append("")
+    lines += ["SKILLS", ", ".join(SKILLS), "", "EDUCATION", "B.S. Computer Science, State University"]
+    return "\n".join(lines)
+
+
+def build_docx(text: str) -> bytes:
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def build_pdf(text: str) -> bytes:
+    """Lay text out as Helvetica lines in a minimal multi-page PDF.
+
+    No PDF writer ships with the app, and PyPDF2 cannot place text, so the
+    file is assembled by hand: catalog, page tree, one font, then a page and
+    content stream per page, followed by the cross-reference table.
+    """
+    lines = []
+    for line in text.splitlines() or [""]:
+        while len(line) > PDF_LINE_CHARS:
+            lines.append(line[:PDF_LINE_CHARS])
+            line = line[PDF_LINE_CHARS:]
+        lines.append(line)
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)]
+
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page]
+        stream = ("BT /F1 10 Tf 13 TL 50 760 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET")
+        stream_bytes = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream_bytes), stream_bytes))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def synthetic_corpus(sizes: list[int]) -> list[dict]:
+    corpus = []
+    for roles in sizes:
+        text = synthetic_resume(roles)
+        corpus.append({"roles": roles, "text": text, "docx": build_docx(text), "pdf": build_pdf(text)})
+    return corpus
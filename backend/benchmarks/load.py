@@ -0,0 +1,124 @@
+"""Drive /optimize-resume concurrently in-process against the stub LLM backend.
+
+Requests go through the full ASGI app (middleware, upload ingestion, parse
+pool, AI client, DOCX rendering and artifact storage) over httpx's ASGI
+transport, so no server or network is involved. The stub's timing comes from
+the STUB_* settings, which `configure_environment` must apply before the app
+is first imported.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+from .corpus import build_docx, synthetic_resume
+from .results import summarize_latencies
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer building Python microservices with FastAPI, PostgreSQL and Redis, "
+    "deployed with Docker and Kubernetes on AWS. Experience with Kafka and mentoring is a plus."
+)
+
+
+def configure_environment(stub_settings: dict[str, str]) -> None:
+    """Select the stub backend, lift rate limits and quiet logging for the app import."""
+    os.environ["LLM_BACKEND"] = "stub"
+    # Every request comes from one client address; measure the pipeline, not the limiter.
+    os.environ.setdefault("RATE_LIMIT_REQUESTS_PER_MINUTE", "0")
+    os.environ.setdefault("LLM_RATE_LIMIT_CALLS_PER_MINUTE", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_TO_FILE", "false")
+    for name, value in stub_settings.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    total: int,
+    resume: bytes,
+    mode: str,
+    requisition_prefix: str = "",
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/optimize-resume",
+                files={"resume_file": ("resume.docx", resume, DOCX_MEDIA_TYPE)},
+                # A distinct description per request keeps the keyword and result caches cold.
+                data={"job_description": f"{JOB_DESCRIPTION} Requisition {requisition_prefix}{index}.", "mode": mode},
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    wall_seconds = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "mode": mode,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "errors": sum(count for code, count in statuses.items() if code != 200),
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(total / wall_seconds, 3),
+        "latency": summarize_latencies(latencies),
+    }
+
+
+async def run_load(
+    concurrency_levels: list[int],
+    requests_per_level: int,
+    roles: int,
+    mode: str,
+    warm_caches: bool,
+) -> dict:
+    from app import api
+
+    if not warm_caches:
+        api.optimizer.keyword_cache = None
+        api.document_parser.text_cache = None
+
+    resume = build_docx(synthetic_resume(roles))
+    await api.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # Cold runs also vary descriptions between levels, or later levels
+            # would be served whole from the result cache.
+            levels = [
+                await run_level(
+                    client,
+                    concurrency,
+                    requests_per_level,
+                    resume,
+                    mode,
+                    requisition_prefix="" if warm_caches else f"{level}-",
+                )
+                for level, concurrency in enumerate(concurrency_levels)
+            ]
+    finally:
+        await api.app.router.shutdown()
+
+    stub = api.model_manager.model
+    return {
+        "levels": levels,
+        "stub": {
+            "latency_ms": stub.latency_seconds * 1000,
+            "latency_jitter_ms": stub.latency_jitter_seconds * 1000,
+            "tokens_per_second": stub.tokens_per_second,
+            "output_tokens": stub.output_tokens,
+            "failure_rate": stub.failure_rate,
+        },
+        "llm": api.optimizer.llm.stats(),
+    }
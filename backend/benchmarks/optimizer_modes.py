@@ -0,0 +1,130 @@
+"""Compare the three-call chain with the single-pass structured mode.
+
+Runs the optimize pipeline against the configured Gemini model in both modes
+and reports latency, AI calls, estimated tokens, single-pass fallbacks and a
+keyword-coverage quality proxy (the share of extracted keywords that appear in
+the optimized resume).
+
+    cd backend && python -m benchmarks.optimizer_modes --runs 5 --output modes.json
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+
+from app.api import optimizer
+from app.budget import track_token_usage
+from app.processing import Stage, build_optimization_stages, pipeline_mode, run_stage_graph
+
+SAMPLE_RESUME = """
+JANE DOE
+Backend Engineer | jane@example.com
+
+SUMMARY
+Backend engineer with six years building Python services and data pipelines.
+
+EXPERIENCE
+Senior Software Engineer, Acme Corp (2021 - present)
+- Built FastAPI services handling 2M requests per day on AWS ECS
+- Moved batch ETL jobs from cron to Airflow, cutting failures by 40%
+- Led a team of four through a PostgreSQL 11 to 15 upgrade
+
+Software Engineer, Globex (2018 - 2021)
+- Wrote Django REST APIs for the billing platform
+- Added Redis caching that reduced p95 latency from 900ms to 250ms
+
+SKILLS
+Python, FastAPI, Django, PostgreSQL, Redis, Docker, AWS, Airflow
+
+EDUCATION
+B.S. Computer Science, State University
+""".strip()
+
+SAMPLE_JOB_DESCRIPTION = """
+We are hiring a Senior Backend Engineer to build the APIs behind our logistics
+platform. You will design Python microservices, own their reliability in
+production on Kubernetes, and work with data engineering on event pipelines.
+
+Requirements:
+- 5+ years of Python, ideally FastAPI or Flask
+- Strong PostgreSQL and caching experience
+- Kubernetes, Docker and Terraform on AWS or GCP
+- Kafka or another streaming platform
+- Experience mentoring engineers
+
+We are an equal opportunity employer.
+""".strip()
+
+
+def keyword_coverage(keywords: str, resume: str) -> float:
+    terms = [re.sub(r"^[\s\-*\d.)]+", "", line).strip().lower() for line in keywords.splitlines()]
+    terms = [term for term in terms if term and len(term) <= 60]
+    if not terms:
+        return 0.0
+    resume_lower = resume.lower()
+    return round(sum(term in resume_lower for term in terms) / len(terms), 3)
+
+
+async def run_once(mode: str) -> dict:
+    usage = track_token_usage()
+    stages = build_optimization_stages(optimizer, None, {}, SAMPLE_JOB_DESCRIPTION, mode=mode)
+
+    async def sample_resume():
+        return SAMPLE_RESUME
+
+    stages["resume_text"] = Stage((), sample_resume)
+    started = time.perf_counter()
+    results = await run_stage_graph(stages)
+    return {
+        "latency_seconds": round(time.perf_counter() - started, 3),
+        "mode_used": pipeline_mode(results),
+        "keyword_coverage": keyword_coverage(results["keywords"], results["optimized_resume"]),
+        **usage.as_dict(),
+    }
+
+
+def summarize(mode: str, runs: list[dict]) -> dict:
+    latencies = [run["latency_seconds"] for run in runs]
+    return {
+        "mode": mode,
+        "runs": len(runs),
+        "latency_mean_seconds": round(statistics.mean(latencies), 3),
+        "latency_median_seconds": round(statistics.median(latencies), 3),
+        "ai_calls_mean": round(statistics.mean(run["calls"] for run in runs), 2),
+        "total_tokens_mean": round(statistics.mean(run["total_tokens"] for run in runs)),
+        "keyword_coverage_mean": round(statistics.mean(run["keyword_coverage"] for run in runs), 3),
+        "fallbacks": sum(run["mode_used"] != mode for run in runs),
+    }
+
+
+async def main(runs: int) -> dict:
+    # Repeat runs would otherwise hit the keyword cache and flatter the chain.
+    optimizer.keyword_cache = None
+    results = {}
+    for mode in ("chain", "single_pass"):
+        samples = [await run_once(mode) for _ in range(runs)]
+        results[mode] = {"summary": summarize(mode, samples), "samples": samples}
+    chain, single = results["chain"]["summary"], results["single_pass"]["summary"]
+    results["latency_reduction"] = round(1 - single["latency_mean_seconds"] / chain["latency_mean_seconds"], 3)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Also write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if not optimizer.use_gemini:
+        raise SystemExit("GEMINI_API_KEY is not configured; both modes would only return demo text.")
+
+    report = asyncio.run(main(args.runs))
+    for mode in ("chain", "single_pass"):
+        print(json.dumps(report[mode]["summary"]))
+    print(f"latency reduction: {report['latency_reduction']:.1%}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            json.dump(report, file_handle, indent=2)
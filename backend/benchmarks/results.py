@@ -0,0 +1,77 @@
+"""Latency summaries and the JSON results file shared by the benchmarks."""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank percentile, so p99 of a small run is an observed value."""
+    rank = max(1, math.ceil(q / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize_latencies(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def environment() -> dict:
+    """Enough context to tell whether two results files are comparable."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as file_handle:
+        json.dump(results, file_handle, indent=2)
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    """Describe p50/p95 changes for every stage and load level both runs share."""
+
+    def keyed(results: dict) -> dict:
+        rows = {}
+        for row in results.get("stages", []):
+            rows[f"{row['stage']} roles={row['roles']}"] = row
+        for row in results.get("load", []):
+            rows[f"load concurrency={row['concurrency']}"] = row
+        return rows
+
+    before, after = keyed(previous), keyed(current)
+    lines = []
+    for key in after:
+        if key not in before:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p95_ms"):
+            old, new = before[key]["latency"][metric], after[key]["latency"][metric]
+            delta = (new - old) / old if old else 0.0
+            changes.append(f"{metric} {old:.1f} -> {new:.1f} ({delta:+.1%})")
+        lines.append(f"{key}: " + ", ".join(changes))
+    return lines
@@ -0,0 +1,94 @@
+"""Time the CPU-bound pipeline stages in isolation on the synthetic corpus."""
+
+import asyncio
+import io
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+from app.artifacts import FIXED_ZIP_TIME, DiskArtifactStore, build_zip
+from app.optimizer import ModelManager, ResumeOptimizer
+from app.parsing import parse_docx, parse_pdf
+from app.processing import save_output_files
+
+from .corpus import synthetic_corpus
+from .results import summarize_latencies
+
+
+def time_calls(call, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def repack_reproducibly(package: bytes) -> bytes:
+    """Rewrite an OOXML package with fixed member timestamps.
+
+    python-docx stamps every member with the current time, so the same text
+    would otherwise hash differently from one second to the next.
+    """
+    with zipfile.ZipFile(io.BytesIO(package)) as source:
+        members = {info.filename: source.read(info) for info in source.infolist()}
+    return build_zip(members, date_time=FIXED_ZIP_TIME)
+
+
+def render_with_python_docx(content: str, title: str) -> bytes:
+    """The renderer DocxRenderer replaced, kept as the rendering baseline."""
+    doc = Document()
+    doc.add_heading(title, 0)
+    for paragraph in content.split("\n"):
+        if paragraph.strip():
+            doc.add_paragraph(paragraph)
+    file_stream = io.BytesIO()
+    doc.save(file_stream)
+    return repack_reproducibly(file_stream.getvalue())
+
+
+def run_stage_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Extraction, DOCX rendering and saving results, per resume size.
+
+    `create_docx_python_docx` is the old python-docx rendering path, timed on
+    the same text as `create_docx_from_text` for comparison.
+
+    Parsing calls the functions parse workers run, without the pool or the
+    parsed-text cache, so the numbers are the parse cost alone. Saving writes
+    to a throwaway disk store.
+    """
+    optimizer = ResumeOptimizer(ModelManager(backend="stub"))
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="resumate-bench-") as directory:
+        store = DiskArtifactStore(Path(directory), ttl_seconds=3600)
+        for document in synthetic_corpus(sizes):
+            text = document["text"]
+            stages = {
+                "extract_pdf": (len(document["pdf"]), lambda: parse_pdf(document["pdf"], 0)),
+                "extract_docx": (len(document["docx"]), lambda: parse_docx(document["docx"])),
+                "create_docx_from_text": (
+                    len(text),
+                    lambda: optimizer.create_docx_from_text(text, "Optimized Resume"),
+                ),
+                "create_docx_python_docx": (
+                    len(text),
+                    lambda: render_with_python_docx(text, "Optimized Resume"),
+                ),
+                "save_output_files": (
+                    len(text) * 2,
+                    lambda: asyncio.run(save_output_files(optimizer, store, text, text)),
+                ),
+            }
+            for stage, (input_size, call) in stages.items():
+                call()  # warm up imports and caches inside the libraries
+                rows.append({
+                    "stage": stage,
+                    "roles": document["roles"],
+                    "input_bytes": input_size,
+                    "latency": summarize_latencies(time_calls(call, repeat)),
+                })
+    optimizer.shutdown()
+    return rows
@@ -1,7 +1,16 @@
-from app import app
 from app.config import DEBUG, HOST, LOG_LEVEL, PORT, logger
 
 
+def __getattr__(name: str):
+    # Parse workers re-import this module when they start, so the API is only
+    # built on demand (`uvicorn main:app` still works).
+    if name == "app":
+        from app import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     import uvicorn
 